@@ -28,6 +28,8 @@ class CactusAPI(API):
         self.password = password
         self.URL = url
 
+        self.trusted = set()
+
     async def request(self, method, endpoint, is_json=True, **kwargs):
         """Send HTTP request to endpoint."""
 
@@ -247,10 +249,20 @@ class CactusAPI(API):
             user=self.token, service=service))
 
     async def get_trust(self, user_id=None):
-        """Get trusted users."""
+        """Get trusted users.
+
+        Getting every trusted user also refreshes :attr:`trusted`.
+        """
 
         if user_id is None:
-            return await self.get("/user/{user}/trust".format(user=self.token))
+            response = await self.get("/user/{user}/trust".format(
+                user=self.token))
+            if response.status == 200:
+                self.trusted = {
+                    str(trust["attributes"]["userId"])
+                    for trust in (await response.json())["data"]
+                }
+            return response
 
         return await self.get("/user/{user}/trust/{user_id}".format(
             user=self.token, user_id=user_id))
@@ -260,11 +272,19 @@ class CactusAPI(API):
 
         data = {"userName": username}
 
-        return await self.patch("/user/{user}/trust/{user_id}".format(
+        response = await self.patch("/user/{user}/trust/{user_id}".format(
             user=self.token, user_id=user_id), data=json.dumps(data))
+        if response.status in (200, 201):
+            self.trusted.add(str(user_id))
+
+        return response
 
     async def remove_trust(self, user_id):
         """Remove user trust."""
 
-        return await self.delete("/user/{user}/trust/{user_id}".format(
+        response = await self.delete("/user/{user}/trust/{user_id}".format(
             user=self.token, user_id=user_id))
+        if response.status == 200:
+            self.trusted.discard(str(user_id))
+
+        return response
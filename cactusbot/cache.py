@@ -0,0 +1,308 @@
+"""Bounded, expiring caches."""
+
+import os
+import re
+import time
+from collections import OrderedDict
+from itertools import repeat
+
+JOURNAL_EXPR = re.compile(r"^([^\t\n]*)\t([^\t\n]*)\t(\d+(?:\.\d*)?)$",
+                          re.MULTILINE)
+
+
+class ExpiringCache:
+    """Mapping with a maximum size, whose entries expire after a time.
+
+    Entries are kept in least-recently-used order. Inserting into a full cache
+    evicts the least recently used entry, and expired entries are removed from
+    the old end of the cache as new ones are inserted, so every operation is
+    amortised O(1).
+
+    Parameters
+    ----------
+    maximum : :obj:`int` or :obj:`None`
+        The maximum number of entries. If :obj:`None`, the size is unbounded.
+    ttl : :obj:`float` or :obj:`None`
+        The default number of seconds for which an entry is kept. If
+        :obj:`None`, entries only leave the cache when evicted.
+    clock
+        Function returning the current time, in seconds.
+
+    Examples
+    --------
+    >>> cache = ExpiringCache(maximum=2)
+    >>> cache["a"], cache["b"], cache["c"] = 1, 2, 3
+    >>> list(cache)
+    ['b', 'c']
+    >>> "a" in cache
+    False
+    """
+
+    def __init__(self, maximum=None, ttl=None, clock=time.time):
+
+        self.maximum = maximum
+        self.ttl = ttl
+        self.clock = clock
+
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data.copy())
+
+    def __contains__(self, key):
+        return self._get(key) is not None
+
+    def __getitem__(self, key):
+        entry = self._get(key)
+        if entry is None:
+            raise KeyError(key)
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def _get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] is not None and entry[0] <= self.clock():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key, default=None):
+        """Get the value of an entry which has not expired.
+
+        Parameters
+        ----------
+        key
+            The key of the entry.
+        default
+            The value to return if the entry is missing or has expired.
+        """
+
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def set(self, key, value, ttl=None):
+        """Insert or refresh an entry.
+
+        Parameters
+        ----------
+        key
+            The key of the entry.
+        value
+            The value of the entry.
+        ttl : :obj:`float` or :obj:`None`
+            The number of seconds for which to keep the entry. If :obj:`None`,
+            :attr:`ttl` is used.
+        """
+
+        now = self.clock()
+
+        if ttl is None:
+            ttl = self.ttl
+        expiry = None if ttl is None else now + ttl
+
+        self._data[key] = (expiry, value)
+        self._data.move_to_end(key)
+
+        self.expire(now)
+
+        if self.maximum is not None:
+            while len(self._data) > self.maximum:
+                self._data.popitem(last=False)
+
+    def restore(self, keys, expiries, value=True):
+        """Insert entries with known expiry times, in bulk.
+
+        Parameters
+        ----------
+        keys : :obj:`list`
+            The keys of the entries, from least to most recently used.
+        expiries : :obj:`list` of :obj:`float`
+            The expiry time of each entry.
+        value
+            The value of every entry.
+        """
+
+        data = self._data
+
+        if not data:
+            data.update(zip(keys, zip(expiries, repeat(value))))
+            if len(data) == len(keys):
+                keys = ()
+            else:
+                data.clear()
+
+        for key, expiry in zip(keys, expiries):
+            data.pop(key, None)
+            data[key] = (expiry, value)
+
+        self.expire()
+
+        if self.maximum is not None:
+            while len(data) > self.maximum:
+                data.popitem(last=False)
+
+    def entries(self):
+        """Iterate over the keys and expiry times of unexpired entries.
+
+        Entries are yielded from least to most recently used.
+        """
+
+        now = self.clock()
+        for key, (expiry, _) in list(self._data.items()):
+            if expiry is None or expiry > now:
+                yield key, expiry
+
+    def pop(self, key, default=None):
+        """Remove an entry, returning its value if it has not expired."""
+
+        entry = self._get(key)
+        if entry is None:
+            return default
+        del self._data[key]
+        return entry[1]
+
+    def expire(self, now=None):
+        """Remove expired entries from the least recently used end."""
+
+        if now is None:
+            now = self.clock()
+
+        while self._data:
+            expiry, _ = next(iter(self._data.values()))
+            if expiry is None or expiry > now:
+                break
+            self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry."""
+        self._data.clear()
+
+
+class CacheJournal:
+    """Append-only journal of the keys of named :obj:`ExpiringCache` objects.
+
+    Each inserted key is appended to the journal as one line, with its
+    expiry time, so the caches can be reloaded after a restart. Once the
+    journal holds many more lines than there are live entries, it is
+    compacted by rewriting only the live entries.
+
+    Parameters
+    ----------
+    path : :obj:`str`
+        The path of the journal file.
+    caches : :obj:`dict` of :obj:`ExpiringCache`
+        The caches to journal, by name.
+    compact_ratio : :obj:`float`
+        The number of journal lines per live entry at which to compact.
+    compact_minimum : :obj:`int`
+        The minimum number of journal lines before compacting.
+    """
+
+    def __init__(self, path, caches, *, compact_ratio=2,
+                 compact_minimum=1024):
+
+        self.path = path
+        self.caches = caches
+
+        self.compact_ratio = compact_ratio
+        self.compact_minimum = compact_minimum
+
+        self._file = None
+        self._lines = 0
+
+    def load(self):
+        """Load unexpired entries from the journal into the caches."""
+
+        try:
+            with open(self.path, encoding="utf-8") as journal:
+                text = journal.read()
+        except FileNotFoundError:
+            text = ""
+
+        rows = JOURNAL_EXPR.findall(text)
+        for name, cache in self.caches.items():
+            entries = [(key, expiry) for row_name, key, expiry in rows
+                       if row_name == name]
+            if entries:
+                keys, expiries = zip(*entries)
+                cache.restore(keys, list(map(float, expiries)))
+
+        self._lines = text.count('\n')
+        self._open()
+
+        if self._lines > self._threshold():
+            self.compact()
+
+    def _open(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.path, 'a', encoding="utf-8")
+
+    def _threshold(self):
+        live = sum(len(cache) for cache in self.caches.values())
+        return max(self.compact_minimum, self.compact_ratio * live)
+
+    def record(self, name, key):
+        """Append the entry of a cache to the journal.
+
+        Parameters
+        ----------
+        name : :obj:`str`
+            The name of the cache.
+        key : :obj:`str`
+            The key of the entry, which has just been inserted.
+        """
+
+        if self._file is None:
+            self._open()
+
+        cache = self.caches[name]
+        if not cache.ttl or '\t' in key or '\n' in key:
+            return
+        expiry = cache.clock() + cache.ttl
+
+        self._file.write("{}\t{}\t{!r}\n".format(name, key, expiry))
+        self._file.flush()
+        self._lines += 1
+
+        if self._lines > self._threshold():
+            self.compact()
+
+    def compact(self):
+        """Rewrite the journal with only the live entries."""
+
+        temporary = self.path + ".tmp"
+        lines = 0
+
+        with open(temporary, 'w', encoding="utf-8") as journal:
+            for name, cache in self.caches.items():
+                for key, expiry in cache.entries():
+                    if expiry is not None:
+                        journal.write("{}\t{}\t{!r}\n".format(
+                            name, key, expiry))
+                        lines += 1
+
+        os.replace(temporary, self.path)
+
+        self._lines = lines
+        self._open()
+
+    def close(self):
+        """Close the journal file."""
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
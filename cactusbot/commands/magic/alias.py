@@ -14,7 +14,7 @@ class Alias(Command):
                   raw: "packet"):
         """Add a new command alias."""
 
-        _, _, _, _, *args = raw.split()
+        args = [token.packet for token in raw.tokens[4:]]
 
         if args:
             packet_args = MessagePacket.join(
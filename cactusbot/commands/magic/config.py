@@ -16,11 +16,10 @@ async def _update_config(api, scope, field, section, value):
     })
 
 
-async def _update_spam_config(api, scope, field, value):
+async def _update_spam_config(api, scope, field, value, **fields):
+    fields[field] = value
     return await api.update_config({
-        scope: {
-            field: value
-        }
+        scope: fields
     })
 
 
@@ -144,3 +143,40 @@ class Config(Command):
 
             return "Maximum capitals score is now {value}.".format(
                 value=value)
+
+        @Command.command()
+        async def flood(self, messages: r"\d+", seconds: r"\d+"):
+            """Flood subcommand."""
+
+            await _update_spam_config(
+                self.api, "spam", "maxMessages", int(messages),
+                messageInterval=int(seconds))
+
+            if not int(messages):
+                return "Flooding is now allowed."
+            return ("Maximum messages is now {messages} every {seconds} "
+                    "seconds.").format(messages=messages, seconds=seconds)
+
+        @Command.command()
+        async def repeats(self, value: r"\d+"):
+            """Repeats subcommand."""
+
+            await _update_spam_config(
+                self.api, "spam", "maxRepeats", int(value))
+
+            if not int(value):
+                return "Repeated messages are now allowed."
+            return "Maximum repeated messages is now {value}.".format(
+                value=value)
+
+        @Command.command()
+        async def copies(self, value: r"\d+"):
+            """Copies subcommand."""
+
+            await _update_spam_config(
+                self.api, "spam", "maxCopies", int(value))
+
+            if not int(value):
+                return "Copied messages are now allowed."
+            return "Maximum copied messages is now {value}.".format(
+                value=value)
@@ -1,20 +1,17 @@
 """Trust command."""
 
-import aiohttp
-
 from ...packets import MessagePacket
+from ...services.beam.users import USERS
 from ..command import Command
 
-BASE_URL = "https://beam.pro/api/v1/channels/{username}"
-
 
 async def check_user(username):
     if username.startswith('@'):
         username = username[1:]
-    async with aiohttp.get(BASE_URL.format(username=username)) as response:
-        if response.status == 404:
-            raise NameError
-        return (username, (await response.json())["id"])
+    user_id = await USERS.get_id(username)
+    if user_id is None:
+        raise NameError
+    return (username, user_id)
 
 
 class Trust(Command):
@@ -25,6 +25,8 @@ class Handlers(object):
     `leave`           :obj:`EventPacket`
     `repeat`          :obj:`MessagePacket`
     `config`          :obj:`Packet`
+    `trust`           :obj:`Packet`
+    `backlog`         :obj:`Packet`
     `username_update` :obj:`Packet`
     ================= ====================
 
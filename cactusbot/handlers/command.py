@@ -37,9 +37,11 @@ class CommandHandler(Handler):
             return MessagePacket(
                 "cries with ", ("tag", packet.user), action=True)
 
-        if len(packet) > 1 and packet[0] == "!" and packet[1] != ' ':
+        if packet.text[:1] == "!" and len(packet) > 1 and \
+                packet[0] == "!" and packet[1] != ' ':
 
-            command, *args = packet[1:].text.split()
+            command, *args = (token.text for token in packet.tokens)
+            command = command[1:]
 
             data = {
                 "username": packet.user,
@@ -60,7 +62,7 @@ class CommandHandler(Handler):
 
             else:
 
-                split = packet.split()
+                split = [token.packet for token in packet.tokens]
                 hyphenated_options = (((split[:index]), split[index:])
                                       for index in range(len(split), 0, -1))
 
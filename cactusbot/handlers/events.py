@@ -1,29 +1,76 @@
 """Handle events"""
 
+import asyncio
+import atexit
+import math
 import time
+from collections import Counter, deque
 
+from ..cache import CacheJournal, ExpiringCache
 from ..handler import Handler
 from ..packets import MessagePacket
 
 
 class EventHandler(Handler):
-    """Events handler."""
+    """Events handler.
+
+    Users are remembered for ``cache_time`` seconds after an event is
+    announced, and the oldest users are forgotten once more than
+    ``cache_size`` users are remembered for one event, so memory use is
+    bounded. If ``cache_file`` is set, remembered users are journaled to it,
+    and reloaded on restart.
+
+    Follows and hosts are announced immediately while traffic is quiet.
+    Once another arrives within ``announce_window`` seconds of the last
+    announcement, the rest are collected for the window, and announced in
+    one message.
+
+    Announcements are shed under load. While the outbound chat backlog
+    reaches ``max_backlog`` messages, joins and leaves are dropped, and
+    follows and hosts are always coalesced. While more than
+    ``max_announce_rate`` announcements are made per minute, only every
+    n-th join or leave is announced, so the rate settles under the limit.
+    """
+
+    #: Events whose announcements are coalesced.
+    COALESCED = ("follow", "host")
+
+    #: Maximum number of users to name in a coalesced announcement.
+    MAX_NAMES = 3
+
+    #: Events whose announcements may be dropped under load.
+    SHED = ("join", "leave")
 
     def __init__(self, cache_data, api):
         super().__init__()
 
         self.cache_data = cache_data
-        self.cached_events = {}
 
         self.api = api
 
         self.cached_events = {
-            "follow": {},
-            "join": {},
-            "leave": {},
-            "host": {}
+            event: ExpiringCache(
+                maximum=cache_data.get("cache_size", 10000),
+                ttl=cache_data["cache_time"])
+            for event in ("follow", "join", "leave", "host")
         }
 
+        self.journal = None
+        if cache_data.get("cache_file"):
+            self.journal = CacheJournal(
+                cache_data["cache_file"], self.cached_events)
+            self.journal.load()
+            atexit.register(self.close)
+
+        self._pending = {}
+        self._announced = dict.fromkeys(self.COALESCED, 0)
+
+        self.backlog = 0
+        self._recent = deque()
+        self._skipped = 0
+
+        self.stats = Counter()
+
         self.alert_messages = {
             "follow": {
                 "announce": True,
@@ -123,23 +170,122 @@ class EventHandler(Handler):
                 "leave": values["leave"]
             }
 
+    def close(self):
+        """Close the cache journal, if any."""
+
+        if self.journal is not None:
+            self.journal.close()
+
+    async def on_backlog(self, packet):
+        """Handle outbound chat backlog updates."""
+        self.backlog = packet.kwargs["depth"]
+
+    def _shed(self, event):
+
+        now = time.time()
+        recent = self._recent
+        recent.append(now)
+        while recent[0] <= now - 60:
+            recent.popleft()
+
+        if event not in self.SHED:
+            return False
+
+        if self.backlog >= self.cache_data.get("max_backlog", 5):
+            return True
+
+        load = len(recent) / self.cache_data.get("max_announce_rate", 20)
+        if load <= 1:
+            self._skipped = 0
+            return False
+
+        self._skipped += 1
+        if self._skipped >= math.ceil(load):
+            self._skipped = 0
+            return False
+        return True
+
     async def _cache(self, packet, event):
-        response = MessagePacket(
-            self.alert_messages[event]["message"].replace(
-                "%USER%", packet.user
-            ))
-
-        if packet.success:
-            if self.cache_data["cache_{}".format(event)]:
-                user = packet.user
-                if user in self.cached_events[event]:
-                    since = time.time() - self.cached_events[event][user]
-                    if since >= self.cache_data["cache_time"]:
-                        self.cached_events[event][user] = time.time()
-                        return response
-                else:
-                    self.cached_events[event][user] = time.time()
-                    return response
-            else:
-                return response
-        return None
+
+        if not packet.success:
+            return None
+
+        cache = None
+        if self.cache_data["cache_{}".format(event)]:
+            cache = self.cached_events[event]
+            if packet.user in cache:
+                return None
+
+        if self._shed(event):
+            self.stats["dropped"] += 1
+            return None
+
+        if cache is not None:
+            cache[packet.user] = True
+            if self.journal is not None:
+                self.journal.record(event, packet.user)
+
+        user = packet.user
+        if event in self.COALESCED:
+            users = await self._coalesce(event, user)
+            if users is None:
+                return None
+            user = self.join_names(users)
+
+        return MessagePacket(
+            self.alert_messages[event]["message"].replace("%USER%", user))
+
+    async def _coalesce(self, event, user):
+
+        pending = self._pending.get(event)
+        if pending is not None:
+            pending.append(user)
+            self.stats["merged"] += 1
+            return None
+
+        window = self.cache_data.get("announce_window", 5)
+        now = time.time()
+
+        quiet = self.backlog < self.cache_data.get("max_backlog", 5)
+        if quiet and now - self._announced[event] >= window:
+            self._announced[event] = now
+            return [user]
+
+        pending = self._pending[event] = [user]
+        try:
+            await asyncio.sleep(window)
+        finally:
+            del self._pending[event]
+            self._announced[event] = time.time()
+
+        return pending
+
+    @classmethod
+    def join_names(cls, users):
+        """Join the names of users for an announcement.
+
+        Parameters
+        ----------
+        users : :obj:`list` of :obj:`str`
+            The names of the users.
+
+        Examples
+        --------
+        >>> EventHandler.join_names(["2Cubed"])
+        '2Cubed'
+        >>> EventHandler.join_names(["2Cubed", "Innectic"])
+        '2Cubed and Innectic'
+        >>> EventHandler.join_names(["A", "B", "C", "D", "E"])
+        'A, B, C and 2 others'
+        """
+
+        if len(users) == 1:
+            return users[0]
+
+        if len(users) <= cls.MAX_NAMES:
+            return "{} and {}".format(', '.join(users[:-1]), users[-1])
+
+        others = len(users) - cls.MAX_NAMES
+        return "{} and {} other{}".format(
+            ', '.join(users[:cls.MAX_NAMES]), others,
+            's' if others > 1 else '')
@@ -1,81 +1,430 @@
 """Handle incoming spam messages."""
 
-import aiohttp
+import asyncio
+import string
+from collections import Counter, namedtuple
+from concurrent.futures import (Executor, ProcessPoolExecutor,
+                                ThreadPoolExecutor)
 
 from ..handler import Handler
+from ..moderation import (DomainFilter, FloodDetector, PhraseFilter,
+                          SimilarityDetector)
 from ..packets import BanPacket, MessagePacket
+from ..services.beam.users import USERS
 
-BASE_URL = "https://beam.pro/api/v1/channels/{username}"
+_DELETE_UPPER = str.maketrans('', '', string.ascii_uppercase)
+_DELETE_LOWER = str.maketrans('', '', string.ascii_lowercase)
 
 
-async def get_user_id(username):
-    async with aiohttp.get(BASE_URL.format(username=username)) as response:
-        if response.status == 404:
-            return 0
-        return (await response.json())["id"]
+def caps_score(message):
+    """Score the capitalization of a message.
+
+    Parameters
+    ----------
+    message : :obj:`str`
+        The message to score.
+
+    Returns
+    -------
+    :obj:`int`
+        The number of uppercase characters, minus the number of lowercase
+        characters.
+
+    Examples
+    --------
+    >>> caps_score("THAT was SO COOL!")
+    7
+    >>> caps_score("ÉCLAIRS")
+    7
+    """
+
+    if len(message.encode()) == len(message):
+        return (len(message.translate(_DELETE_LOWER)) -
+                len(message.translate(_DELETE_UPPER)))
+    return sum(map(str.isupper, message)) - sum(map(str.islower, message))
+
+
+class SpamScore(namedtuple("SpamScore", ("caps", "emoji", "urls"))):
+    """Spam scores of a :obj:`MessagePacket`.
+
+    Parameters
+    ----------
+    caps : :obj:`int`
+        The capitalization score of the text components.
+    emoji : :obj:`int`
+        The number of emoji components.
+    urls : :obj:`tuple` of :obj:`str`
+        The data of every URL component.
+    """
+
+    @classmethod
+    def from_packet(cls, packet):
+        """Score a :obj:`MessagePacket`."""
+
+        emoji = 0
+        urls = []
+
+        for chunk in packet:
+            if chunk.type == "emoji":
+                emoji += 1
+            elif chunk.type == "url":
+                urls.append(chunk.data)
+
+        return cls(caps_score(packet.plain), emoji, tuple(urls))
+
+
+def _score_batch(packets, minhash):
+    scores = SpamHandler.score_batch(packets)
+    return list(zip(scores, (minhash(packet.text) for packet in packets)))
 
 
 class SpamHandler(Handler):
-    """Spam handler."""
+    """Spam handler.
+
+    Parameters
+    ----------
+    api : :obj:`CactusAPI`
+        The API used to check trusted users.
+    users : :obj:`BeamUsers`
+        The resolver used to find the IDs of users.
+    executor : :obj:`str`, :obj:`concurrent.futures.Executor`, or :obj:`None`
+        Where to score messages. If ``"thread"`` or ``"process"``, messages
+        are scored in a pool of that kind, in batches, and checked in the
+        order they arrived. If :obj:`None`, messages are scored inline.
+    batch_size : :obj:`int`
+        The maximum number of messages to score in one batch.
+    batch_delay : :obj:`float`
+        The number of seconds to collect messages for, before scoring them.
+        If ``0``, a batch holds every message handled in one iteration of
+        the event loop.
+
+    Trusted users are mirrored from the API on start, and refreshed every
+    :attr:`TRUST_REFRESH` seconds. A failed refresh is retried with
+    exponential backoff. Until the first refresh succeeds, the API is also
+    asked whether each user about to be actioned is trusted.
+    """
+
+    #: Number of seconds between refreshes of the trusted users.
+    TRUST_REFRESH = 300
 
-    def __init__(self, api):
+    #: Maximum number of seconds between retries of a failed refresh.
+    TRUST_RETRY = 60
+
+    def __init__(self, api, users=USERS, *, executor=None, batch_size=64,
+                 batch_delay=0):
         super().__init__()
 
         self.api = api
+        self.users = users
 
         self.config = {
             "max_score": 16,
             "max_emoji": 6,
-            "allow_urls": False
+            "allow_urls": False,
+            "max_messages": 0,
+            "message_interval": 5,
+            "max_repeats": 0,
+            "repeat_interval": 30,
+            "max_copies": 0,
+            "copy_interval": 60
         }
 
+        self.flood = FloodDetector(
+            self.config["max_messages"], self.config["message_interval"],
+            self.config["max_repeats"], self.config["repeat_interval"])
+
+        self.phrases = PhraseFilter()
+        self.domains = DomainFilter()
+
+        self.similarity = SimilarityDetector(
+            self.config["max_copies"], self.config["copy_interval"])
+
+        if executor == "thread":
+            executor = ThreadPoolExecutor(max_workers=1)
+        elif executor == "process":
+            executor = ProcessPoolExecutor(max_workers=1)
+        elif executor is not None and not isinstance(executor, Executor):
+            raise ValueError("Invalid executor: {!r}.".format(executor))
+
+        self.executor = executor
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+
+        self._batch = []
+        self._flush_handle = None
+        self._applied = None
+
+        self.trust_loaded = False
+        self._trust_task = None
+
+        self.stats = Counter()
+
     async def on_message(self, packet):
-        """Handle message events."""
+        """Handle message events.
 
-        if packet.role >= 4:
-            return
+        Messages are checked locally first, so only messages which would be
+        actioned pay for resolving the sender and checking their trust.
+        """
 
-        user_id = await get_user_id(packet.user)
-        if (await self.api.get_trust(user_id)).status == 200:
+        if packet.role >= 4:
             return
 
-        exceeds_caps = self.check_caps(''.join(
-            chunk.text for chunk in packet if
-            chunk.type == "text"
-        ))
-        exceeds_emoji = self.check_emoji(packet)
-        contains_urls = self.contains_urls(packet)
-
-        if exceeds_caps:
-            return (MessagePacket("Please do not spam capital letters.",
-                                  target=packet.user),
-                    BanPacket(packet.user, 1),
-                    StopIteration)
-        elif exceeds_emoji:
-            return (MessagePacket("Please do not spam emoji.",
-                                  target=packet.user),
-                    BanPacket(packet.user, 1),
-                    StopIteration)
-        elif contains_urls:
-            return (MessagePacket("Please do not post URLs.",
-                                  target=packet.user),
-                    BanPacket(packet.user, 5),
-                    StopIteration)
+        if self.executor is None:
+            response = self.check(packet)
         else:
+            response = await self._check_batched(packet)
+
+        if response is None:
+            self.stats["lookups_avoided"] += 1
+            return None
+
+        self.stats["lookups"] += 1
+
+        try:
+            user_id = await self.users.get_id(packet.user)
+        except LookupError:
+            self.logger.warning("Could not resolve %s. Not actioning.",
+                                packet.user)
+            self.stats["unresolved"] += 1
             return None
 
+        if user_id is not None and await self._is_trusted(user_id):
+            self.stats["trusted"] += 1
+            return None
+
+        self.stats["actioned"] += 1
+        return response
+
+    def check(self, packet, score=None, signature=None):
+        """Check a message for spam, without any network access.
+
+        Parameters
+        ----------
+        packet : :obj:`MessagePacket`
+            The message to check.
+        score : :obj:`SpamScore` or :obj:`None`
+            The precomputed score of the message. If :obj:`None`, the message
+            is scored.
+        signature : :obj:`tuple` of :obj:`int` or :obj:`None`
+            The precomputed similarity signature of the message. If
+            :obj:`None`, it is computed if needed.
+
+        Returns
+        -------
+        :obj:`tuple` or :obj:`None`
+            The response to the spam, or :obj:`None` if the message is clean.
+        """
+
+        if score is None:
+            score = SpamScore.from_packet(packet)
+
+        flood = self.flood.check(packet.user, packet.text)
+        copied = self.similarity.check(packet.text, signature)
+
+        if score.caps > self.config["max_score"]:
+            return self._moderate(
+                packet, "Please do not spam capital letters.", 1)
+        elif score.emoji > self.config["max_emoji"]:
+            return self._moderate(packet, "Please do not spam emoji.", 1)
+        elif self._check_urls(score.urls, packet.plain):
+            return self._moderate(packet, "Please do not post URLs.", 5)
+        elif self.phrases.search(packet.text) is not None:
+            return self._moderate(
+                packet, "Please do not use banned phrases.", 5)
+        elif flood == "flood":
+            return self._moderate(packet, "Please slow down.", 5)
+        elif flood == "repeat":
+            return self._moderate(
+                packet, "Please do not repeat messages.", 5)
+        elif copied:
+            return self._moderate(
+                packet, "Please do not spam copied messages.", 5)
+        return None
+
+    async def _check_batched(self, packet):
+
+        future = asyncio.Future()
+        self._batch.append((packet, future))
+
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_event_loop().call_later(
+                self.batch_delay, self._flush)
+
+        return await future
+
+    def _flush(self):
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._batch = self._batch, []
+        self._applied = asyncio.ensure_future(
+            self._apply(batch, self._applied))
+
+    async def _apply(self, batch, previous):
+
+        self.stats["batches"] += 1
+
+        try:
+            results = await asyncio.get_event_loop().run_in_executor(
+                self.executor, _score_batch,
+                [packet for packet, _ in batch], self.similarity.minhash)
+        except Exception as exception:
+            results = [exception] * len(batch)
+
+        if previous is not None:
+            await previous
+
+        for (packet, future), result in zip(batch, results):
+            if future.cancelled():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+                continue
+            try:
+                future.set_result(self.check(packet, *result))
+            except Exception as exception:
+                future.set_exception(exception)
+
+    def _check_urls(self, urls, text):
+
+        for url in urls:
+            allowed = self.domains.check(url)
+            if allowed is False or (
+                    allowed is None and not self.config["allow_urls"]):
+                return True
+
+        return self.domains.search(text) is not None
+
+    @staticmethod
+    def score_batch(packets):
+        """Score a batch of messages at once.
+
+        Parameters
+        ----------
+        packets : :obj:`list` of :obj:`MessagePacket`
+            The messages to score.
+
+        Returns
+        -------
+        :obj:`list` of :obj:`SpamScore`
+            The score of each message, in order.
+        """
+
+        from_packet = SpamScore.from_packet
+        return [from_packet(packet) for packet in packets]
+
+    @staticmethod
+    def _moderate(packet, message, duration):
+        return (MessagePacket(message, target=packet.user),
+                BanPacket(packet.user, duration),
+                StopIteration)
+
+    async def _is_trusted(self, user_id):
+
+        if str(user_id) in self.api.trusted:
+            return True
+        if self.trust_loaded:
+            return False
+        return (await self.api.get_trust(user_id)).status == 200
+
+    async def on_start(self, _):
+        """Load trusted users, and keep them up to date."""
+
+        if self._trust_task is None:
+            self._trust_task = asyncio.ensure_future(self._refresh_trust())
+
+    async def load_trust(self):
+        """Reload trusted users.
+
+        Returns
+        -------
+        :obj:`bool`
+            Whether the trusted users were loaded.
+        """
+
+        try:
+            response = await self.api.get_trust()
+        except Exception:
+            self.logger.warning("Failed to load trusted users.", exc_info=1)
+            return False
+
+        if response.status != 200:
+            self.logger.warning(
+                "Failed to load trusted users: %s.", response.status)
+            return False
+
+        self.trust_loaded = True
+        return True
+
+    async def _refresh_trust(self):
+
+        failures = 0
+        while True:
+            if await self.load_trust():
+                failures = 0
+                delay = self.TRUST_REFRESH
+            else:
+                failures += 1
+                delay = min(2 ** failures, self.TRUST_RETRY)
+            await asyncio.sleep(delay)
+
+    async def on_trust(self, packet):
+        """Handle trust update events."""
+
+        if packet.kwargs["trusted"]:
+            self.api.trusted.add(str(packet.kwargs["user_id"]))
+        else:
+            self.api.trusted.discard(str(packet.kwargs["user_id"]))
+
+    async def on_join(self, packet):
+        """Handle user join events."""
+        self.users.prefetch(packet.user)
+
     async def on_config(self, packet):
         """Handle config update events."""
 
         if packet.kwargs["key"] == "spam":
-            self.config["max_emoji"] = packet.kwargs["values"]["maxEmoji"]
-            self.config["max_score"] = packet.kwargs["values"]["maxCapsScore"]
-            self.config["allow_urls"] = packet.kwargs["values"]["allowUrls"]
+            values = packet.kwargs["values"]
+
+            self.config["max_emoji"] = values["maxEmoji"]
+            self.config["max_score"] = values["maxCapsScore"]
+            self.config["allow_urls"] = values["allowUrls"]
+
+            self.config["max_messages"] = values.get(
+                "maxMessages", self.config["max_messages"])
+            self.config["message_interval"] = values.get(
+                "messageInterval", self.config["message_interval"])
+            self.config["max_repeats"] = values.get(
+                "maxRepeats", self.config["max_repeats"])
+            self.config["repeat_interval"] = values.get(
+                "repeatInterval", self.config["repeat_interval"])
+
+            self.flood.configure(
+                self.config["max_messages"], self.config["message_interval"],
+                self.config["max_repeats"], self.config["repeat_interval"])
+
+            self.config["max_copies"] = values.get(
+                "maxCopies", self.config["max_copies"])
+            self.config["copy_interval"] = values.get(
+                "copyInterval", self.config["copy_interval"])
+
+            self.similarity.max_copies = self.config["max_copies"]
+            self.similarity.interval = self.config["copy_interval"]
+
+            if "bannedPhrases" in values:
+                self.phrases.update(values["bannedPhrases"])
+
+            if "allowedDomains" in values or "deniedDomains" in values:
+                self.domains.update(values.get("allowedDomains", ()),
+                                    values.get("deniedDomains", ()))
 
     def check_caps(self, message):
         """Check for excessive capital characters in the message."""
-        return sum(char.isupper() - char.islower() for
-                   char in message) > self.config["max_score"]
+        return caps_score(message) > self.config["max_score"]
 
     def check_emoji(self, packet):
         """Check for excessive emoji in the message."""
@@ -83,6 +432,7 @@ class SpamHandler(Handler):
                    chunk in packet) > self.config["max_emoji"]
 
     def contains_urls(self, packet):
-        """Check for URLs in the message."""
-        return not self.config["allow_urls"] and any(
-            chunk.type == "url" for chunk in packet)
+        """Check for disallowed URLs or denied domains in the message."""
+        return self._check_urls(
+            [chunk.data for chunk in packet if chunk.type == "url"],
+            packet.plain)
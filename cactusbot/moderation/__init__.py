@@ -0,0 +1,10 @@
+"""Spam detection."""
+
+from .domains import DomainFilter
+from .flood import FloodDetector
+from .phrases import PhraseFilter
+from .similarity import SimilarityDetector
+
+__all__ = [
+    "DomainFilter", "FloodDetector", "PhraseFilter", "SimilarityDetector"
+]
@@ -0,0 +1,140 @@
+"""Match allowed and denied domains."""
+
+import re
+from urllib.parse import urlsplit
+
+DOMAIN_EXPR = re.compile(
+    r"(?<![\w.@-])((?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z]{2,})\b",
+    re.IGNORECASE)
+SCHEME_EXPR = re.compile(r"(?:[a-z][a-z0-9+.-]*:)?//", re.IGNORECASE)
+
+
+class DomainFilter:
+    """Match URLs against allowed and denied domains.
+
+    Domains are stored in a trie of their labels, from the top-level domain
+    down, so a lookup costs one step per label of the host, regardless of the
+    number of listed domains. Listing a domain also lists its subdomains, and
+    the most specific listed domain wins.
+
+    Parameters
+    ----------
+    allowed : iterable of :obj:`str`
+        The allowed domains.
+    denied : iterable of :obj:`str`
+        The denied domains.
+
+    Examples
+    --------
+    >>> domains = DomainFilter(allowed=["beam.pro"], denied=["bad.beam.pro"])
+    >>> domains.check("https://beam.pro/2Cubed")
+    True
+    >>> domains.check("https://very.bad.beam.pro/")
+    False
+    >>> domains.check("google.com") is None
+    True
+    """
+
+    def __init__(self, allowed=(), denied=()):
+
+        self._root = [{}, None]
+        self._denied = 0
+
+        self.update(allowed, denied)
+
+    def update(self, allowed=(), denied=()):
+        """Replace the allowed and denied domains.
+
+        Parameters
+        ----------
+        allowed : iterable of :obj:`str`
+            Every allowed domain.
+        denied : iterable of :obj:`str`
+            Every denied domain. A domain which is both allowed and denied is
+            denied.
+        """
+
+        root = [{}, None]
+        self._denied = 0
+
+        for domains, verdict in ((allowed, True), (denied, False)):
+            for domain in domains:
+                labels = self._labels(domain)
+                if not labels:
+                    continue
+
+                node = root
+                for label in labels:
+                    node = node[0].setdefault(label, [{}, None])
+                node[1] = verdict
+
+                if verdict is False:
+                    self._denied += 1
+
+        self._root = root
+
+    @staticmethod
+    def _labels(url):
+
+        if not SCHEME_EXPR.match(url):
+            url = "//" + url
+
+        try:
+            host = urlsplit(url).hostname
+        except ValueError:
+            return []
+
+        if not host:
+            return []
+
+        return host.rstrip('.').split('.')[::-1]
+
+    def check(self, url):
+        """Check the domain of a URL.
+
+        Parameters
+        ----------
+        url : :obj:`str`
+            The URL, or bare domain, to check.
+
+        Returns
+        -------
+        :obj:`bool` or :obj:`None`
+            :obj:`True` if the domain is allowed, :obj:`False` if it is
+            denied, or :obj:`None` if it is not listed.
+        """
+
+        verdict = None
+
+        node = self._root
+        for label in self._labels(url):
+            node = node[0].get(label)
+            if node is None:
+                break
+            if node[1] is not None:
+                verdict = node[1]
+
+        return verdict
+
+    def search(self, text):
+        """Find the first denied domain mentioned in text.
+
+        Parameters
+        ----------
+        text : :obj:`str`
+            The text to search.
+
+        Returns
+        -------
+        :obj:`str` or :obj:`None`
+            The first denied domain, or :obj:`None`.
+        """
+
+        if not self._denied:
+            return None
+
+        for match in DOMAIN_EXPR.finditer(text):
+            if self.check(match.group(1)) is False:
+                return match.group(1).lower()
+
+        return None
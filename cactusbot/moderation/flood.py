@@ -0,0 +1,115 @@
+"""Detect message flooding."""
+
+import time
+from collections import deque
+
+from ..cache import ExpiringCache
+
+
+class FloodDetector:
+    """Detect users sending messages too quickly, or repeating themselves.
+
+    The recent messages of each user are kept in a fixed-size ring buffer of
+    timestamps and message hashes. At most ``max_users`` users are tracked,
+    and users who have been idle for longer than the longest window are
+    forgotten, so memory use is bounded.
+
+    Parameters
+    ----------
+    max_messages : :obj:`int`
+        The maximum number of messages a user may send within ``interval``.
+        If ``0``, flooding is not checked.
+    interval : :obj:`float`
+        The flood window, in seconds.
+    max_repeats : :obj:`int`
+        The maximum number of identical messages a user may send within
+        ``repeat_interval``. If ``0``, repeats are not checked.
+    repeat_interval : :obj:`float`
+        The repeat window, in seconds.
+    max_users : :obj:`int`
+        The maximum number of users to track.
+    clock
+        Function returning the current time, in seconds.
+
+    Examples
+    --------
+    >>> flood = FloodDetector(max_messages=2, max_repeats=5)
+    >>> [flood.check("Stanley", str(number)) for number in range(3)]
+    [None, None, 'flood']
+
+    >>> repeat = FloodDetector(max_messages=5, max_repeats=1)
+    >>> [repeat.check("Stanley", "Hello!") for _ in range(2)]
+    [None, 'repeat']
+    """
+
+    def __init__(self, max_messages=6, interval=5, max_repeats=3,
+                 repeat_interval=30, *, max_users=4096, clock=time.time):
+
+        self.clock = clock
+        self.users = ExpiringCache(maximum=max_users, clock=clock)
+
+        self.configure(max_messages, interval, max_repeats, repeat_interval)
+
+    def configure(self, max_messages, interval, max_repeats,
+                  repeat_interval):
+        """Update the detection thresholds.
+
+        Parameters are the same as those of :obj:`FloodDetector`.
+        """
+
+        self.max_messages = max_messages
+        self.interval = interval
+        self.max_repeats = max_repeats
+        self.repeat_interval = repeat_interval
+
+        self.users.ttl = max(interval, repeat_interval)
+        self.history = max(max_messages, max_repeats) + 1
+
+        for user in self.users:
+            buffer = self.users.get(user)
+            if buffer is not None and buffer.maxlen != self.history:
+                self.users.set(user, deque(buffer, maxlen=self.history))
+
+    def check(self, user, message):
+        """Record a message, and check whether its sender is flooding.
+
+        Parameters
+        ----------
+        user : :obj:`str`
+            The sender of the message.
+        message : :obj:`str`
+            The text of the message.
+
+        Returns
+        -------
+        :obj:`str` or :obj:`None`
+            ``"flood"`` if the user has sent too many messages, ``"repeat"``
+            if the user has sent too many identical messages, or :obj:`None`.
+        """
+
+        if self.max_messages <= 0 and self.max_repeats <= 0:
+            return None
+
+        now = self.clock()
+        key = user.lower()
+        digest = hash(' '.join(message.lower().split()))
+
+        buffer = self.users.get(key)
+        if buffer is None:
+            buffer = deque(maxlen=self.history)
+        buffer.append((now, digest))
+        self.users.set(key, buffer)
+
+        messages = repeats = 0
+        for timestamp, previous in buffer:
+            since = now - timestamp
+            if since < self.interval:
+                messages += 1
+            if since < self.repeat_interval and previous == digest:
+                repeats += 1
+
+        if self.max_messages > 0 and messages > self.max_messages:
+            return "flood"
+        if self.max_repeats > 0 and repeats > self.max_repeats:
+            return "repeat"
+        return None
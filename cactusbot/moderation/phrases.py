@@ -0,0 +1,181 @@
+"""Match banned phrases."""
+
+
+class PhraseFilter:
+    """Find banned phrases in messages with an Aho-Corasick automaton.
+
+    Every phrase is found in a single pass over the message, regardless of
+    the number of phrases. Matching is case-insensitive and, by default,
+    only matches whole words, so ``"ass"`` is not found in ``"classic"``.
+
+    Changes are incremental: added phrases are inserted into the existing
+    trie, removed phrases are unmarked, and the failure links are rebuilt
+    once, before the next search.
+
+    Parameters
+    ----------
+    phrases : :obj:`str`
+        The initial banned phrases.
+    whole_words : :obj:`bool`
+        Whether phrases must start and end at word boundaries.
+
+    Examples
+    --------
+    >>> phrases = PhraseFilter("spam", "eggs")
+    >>> phrases.search("I do not like green EGGS and ham.")
+    'eggs'
+    >>> phrases.search("I like green ham.") is None
+    True
+    >>> phrases.search("Spammers like green ham.") is None
+    True
+    """
+
+    def __init__(self, *phrases, whole_words=True):
+
+        self.whole_words = whole_words
+        self.phrases = set()
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._terminal = [None]
+        self._output = [None]
+
+        self._dirty = False
+
+        self.add(*phrases)
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def __contains__(self, phrase):
+        return phrase.lower() in self.phrases
+
+    def add(self, *phrases):
+        """Add banned phrases."""
+
+        for phrase in phrases:
+            phrase = phrase.lower()
+            if not phrase or phrase in self.phrases:
+                continue
+
+            state = 0
+            for char in phrase:
+                if char not in self._goto[state]:
+                    self._goto[state][char] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._terminal.append(None)
+                    self._output.append(None)
+                state = self._goto[state][char]
+
+            self._terminal[state] = phrase
+            self.phrases.add(phrase)
+            self._dirty = True
+
+    def remove(self, *phrases):
+        """Remove banned phrases."""
+
+        for phrase in phrases:
+            phrase = phrase.lower()
+            if phrase not in self.phrases:
+                continue
+
+            state = 0
+            for char in phrase:
+                state = self._goto[state][char]
+
+            self._terminal[state] = None
+            self.phrases.discard(phrase)
+            self._dirty = True
+
+    def update(self, phrases):
+        """Replace the banned phrases, only changing the differences.
+
+        Parameters
+        ----------
+        phrases : iterable of :obj:`str`
+            Every banned phrase.
+        """
+
+        phrases = {phrase.lower() for phrase in phrases}
+
+        self.remove(*(self.phrases - phrases))
+        self.add(*(phrases - self.phrases))
+
+    def _link(self):
+
+        goto, fail = self._goto, self._fail
+        output, terminal = self._output, self._terminal
+
+        output[0] = None
+        queue = list(goto[0].values())
+        for state in queue:
+            fail[state] = 0
+            output[state] = state if terminal[state] else None
+
+        for state in queue:
+            for char, child in goto[state].items():
+                queue.append(child)
+
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = goto[fallback].get(char, 0)
+
+                output[child] = child if terminal[child] else \
+                    output[fail[child]]
+
+        self._dirty = False
+
+    def search(self, text):
+        """Find the first banned phrase in text.
+
+        Parameters
+        ----------
+        text : :obj:`str`
+            The text to search.
+
+        Returns
+        -------
+        :obj:`str` or :obj:`None`
+            The first banned phrase found, or :obj:`None`.
+        """
+
+        if not self.phrases:
+            return None
+
+        if self._dirty:
+            self._link()
+
+        goto, fail = self._goto, self._fail
+        output, terminal = self._output, self._terminal
+
+        text = text.lower()
+
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            match = output[state]
+            while match is not None:
+                phrase = terminal[match]
+                if not self.whole_words or self._bounded(
+                        text, phrase, end - len(phrase), end):
+                    return phrase
+                match = output[fail[match]]
+
+        return None
+
+    @staticmethod
+    def _bounded(text, phrase, start, end):
+
+        def word(char):
+            return char.isalnum() or char == '_'
+
+        if start > 0 and word(phrase[0]) and word(text[start - 1]):
+            return False
+        if end < len(text) and word(phrase[-1]) and word(text[end]):
+            return False
+        return True
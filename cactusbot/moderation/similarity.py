@@ -0,0 +1,243 @@
+"""Detect near-duplicate messages."""
+
+import itertools
+import random
+import time
+import zlib
+from collections import deque
+
+_PRIME = (1 << 61) - 1
+
+
+class MinHash:
+    """Compute MinHash signatures of messages.
+
+    Signatures are computed from the character shingles of a message, using
+    one hash function split into ``count`` bins. Instances hold no other
+    state, so they are cheap to send to another process.
+
+    Parameters
+    ----------
+    count : :obj:`int`
+        The length of each signature.
+    shingle : :obj:`int`
+        The number of characters in each shingle.
+    min_length : :obj:`int`
+        The minimum length of a message to sign. Shorter messages are
+        ignored.
+    """
+
+    def __init__(self, count=30, shingle=3, min_length=24):
+
+        self.count = count
+        self.shingle = shingle
+        self.min_length = min_length
+
+        generator = random.Random(0)
+        self._hash = (generator.randrange(1, _PRIME),
+                      generator.randrange(_PRIME))
+
+    def __call__(self, message):
+        """Compute the MinHash signature of a message.
+
+        Parameters
+        ----------
+        message : :obj:`str`
+            The message.
+
+        Returns
+        -------
+        :obj:`tuple` of :obj:`int` or :obj:`None`
+            The signature, or :obj:`None` if the message is too short to be
+            checked.
+        """
+
+        message = ' '.join(message.lower().split())
+        if len(message) < self.min_length:
+            return None
+
+        shingles = {
+            zlib.crc32(message[index:index + self.shingle].encode())
+            for index in range(len(message) - self.shingle + 1)
+        }
+
+        count = self.count
+        a, b = self._hash
+
+        signature = [None] * count
+        for shingle in shingles:
+            value, index = divmod((a * shingle + b) % _PRIME, count)
+            current = signature[index]
+            if current is None or value < current:
+                signature[index] = value
+
+        filled = [value for value in signature if value is not None]
+        if len(filled) < count:
+            fallback = filled[0]
+            for index in reversed(range(count)):
+                if signature[index] is None:
+                    signature[index] = fallback
+                else:
+                    fallback = signature[index]
+
+        return tuple(signature)
+
+
+class SimilarityDetector:
+    """Detect waves of near-duplicate messages, such as copy-pasta.
+
+    Messages are reduced to :class:`MinHash` signatures of ``bands * rows``
+    values, and indexed in locality-sensitive hashing buckets, so only
+    messages which share a bucket are compared. Messages older than
+    ``interval`` seconds, or beyond the newest ``max_messages``, are
+    forgotten.
+
+    Parameters
+    ----------
+    max_copies : :obj:`int`
+        The maximum number of similar messages which may be sent within
+        ``interval``, before further similar messages are flagged. If ``0``,
+        no messages are flagged.
+    interval : :obj:`float`
+        The window, in seconds.
+    threshold : :obj:`float`
+        The minimum estimated Jaccard similarity of two similar messages.
+    min_length : :obj:`int`
+        The minimum length of a message to check. Shorter messages are
+        ignored.
+    shingle : :obj:`int`
+        The number of characters in each shingle.
+    bands : :obj:`int`
+        The number of LSH bands.
+    rows : :obj:`int`
+        The number of signature rows in each band.
+    max_messages : :obj:`int`
+        The maximum number of messages to remember.
+    max_candidates : :obj:`int`
+        The maximum number of candidates to compare each message to.
+    clock
+        Function returning the current time, in seconds.
+
+    Examples
+    --------
+    >>> similar = SimilarityDetector(max_copies=1)
+    >>> similar.check("Everyone type 1 in chat if you love this stream!")
+    False
+    >>> similar.check("everyone type 1 in chat if you love the stream!!")
+    True
+    >>> similar.check("What game is this? It looks like a lot of fun.")
+    False
+    """
+
+    def __init__(self, max_copies=5, interval=60, threshold=0.5, *,
+                 min_length=24, shingle=3, bands=10, rows=3,
+                 max_messages=2048, max_candidates=128, clock=time.time):
+
+        self.max_copies = max_copies
+        self.interval = interval
+        self.threshold = threshold
+
+        self.minhash = MinHash(bands * rows, shingle, min_length)
+        self.bands = bands
+        self.rows = rows
+
+        self.max_messages = max_messages
+        self.max_candidates = max_candidates
+        self.clock = clock
+
+        self._ids = itertools.count()
+        self._messages = deque()
+        self._signatures = {}
+        self._buckets = {}
+
+    def __len__(self):
+        return len(self._messages)
+
+    def signature(self, message):
+        """Compute the MinHash signature of a message.
+
+        See :class:`MinHash`.
+        """
+        return self.minhash(message)
+
+    def _expire(self, now):
+
+        messages = self._messages
+        while messages and (len(messages) > self.max_messages or
+                            messages[0][0] <= now - self.interval):
+            _, message_id, keys = messages.popleft()
+            del self._signatures[message_id]
+            for key in keys:
+                bucket = self._buckets[key]
+                bucket.discard(message_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _count(self, signature, keys):
+
+        minimum = self.threshold * len(signature)
+        seen = set()
+        copies = 0
+
+        for key in keys:
+            for candidate in self._buckets.get(key, ()):
+                if candidate in seen:
+                    continue
+                if len(seen) >= self.max_candidates:
+                    return copies
+                seen.add(candidate)
+
+                other = self._signatures[candidate]
+                if sum(map(int.__eq__, signature, other)) >= minimum:
+                    copies += 1
+                    if copies >= self.max_copies:
+                        return copies
+
+        return copies
+
+    def check(self, message, signature=None):
+        """Record a message, and check whether it is a near-duplicate.
+
+        Parameters
+        ----------
+        message : :obj:`str`
+            The message.
+        signature : :obj:`tuple` of :obj:`int` or :obj:`None`
+            The precomputed signature of the message. If :obj:`None`, it is
+            computed from ``message``.
+
+        Returns
+        -------
+        :obj:`bool`
+            Whether more than ``max_copies`` similar messages have been sent
+            within ``interval``.
+        """
+
+        if self.max_copies <= 0:
+            return False
+
+        if signature is None:
+            signature = self.signature(message)
+            if signature is None:
+                return False
+
+        now = self.clock()
+        self._expire(now)
+
+        rows = self.rows
+        keys = [
+            (band, signature[band * rows:(band + 1) * rows])
+            for band in range(self.bands)
+        ]
+
+        copies = self._count(signature, keys)
+
+        message_id = next(self._ids)
+        self._messages.append((now, message_id, keys))
+        self._signatures[message_id] = signature
+        for key in keys:
+            self._buckets.setdefault(key, set()).add(message_id)
+
+        self._expire(now)
+
+        return copies >= self.max_copies
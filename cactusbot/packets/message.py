@@ -2,10 +2,21 @@
 
 import re
 from collections import namedtuple
+from functools import lru_cache
 
 from .packet import Packet
 
 
+@lru_cache(maxsize=128)
+def _compile_replacements(keys):
+    """Compile a single expression matching any of ``keys``.
+
+    Longer keys are tried first, so overlapping keys match greedily.
+    """
+    return re.compile('|'.join(
+        re.escape(key) for key in sorted(keys, key=len, reverse=True)))
+
+
 class MessageComponent(namedtuple("Component", ("type", "data", "text"))):
     """:obj:`MessagePacket` component.
 
@@ -32,6 +43,20 @@ class MessageComponent(namedtuple("Component", ("type", "data", "text"))):
     """
 
 
+class MessageToken(namedtuple("Token", ("packet", "text", "lower"))):
+    """Single whitespace-separated word of a :obj:`MessagePacket`.
+
+    Parameters
+    ----------
+    packet : :obj:`MessagePacket`
+        The word, retaining its original components.
+    text : :obj:`str`
+        Text representation of the word.
+    lower : :obj:`str`
+        Lowercase text representation of the word.
+    """
+
+
 class MessagePacket(Packet):
     """Packet to store messages.
 
@@ -56,6 +81,11 @@ class MessagePacket(Packet):
         The single user target of the message.
     """
 
+    _shared = False
+
+    _plain = None
+    _tokens = None
+
     def __init__(self, *message, user="", role=1, action=False, target=None):
         super().__init__()
 
@@ -82,18 +112,12 @@ class MessagePacket(Packet):
         return "<Message: {} - \"{}\">".format(self.user, self.text)
 
     def __len__(self):
-        return len(''.join(
-            chunk.text for chunk in self.message
-            if chunk.type == "text"
-        ))
+        return len(self.plain)
 
     def __getitem__(self, key):
 
         if isinstance(key, int):
-            return ''.join(
-                chunk.text for chunk in self.message
-                if chunk.type == "text"
-            )[key]
+            return self.plain[key]
 
         elif isinstance(key, slice):
 
@@ -117,8 +141,8 @@ class MessagePacket(Packet):
                 else:
                     message.pop(0)
                 if count == 0:
-                    return self.copy(*message)
-            return self.copy(*message)
+                    return self._derive(message)
+            return self._derive(message)
 
         raise TypeError
 
@@ -133,13 +157,13 @@ class MessagePacket(Packet):
 
     def __add__(self, other):
 
-        return MessagePacket(
-            *(self.message + other.message),
+        return MessagePacket._from_components(
+            self.message + other.message,
             user=self.user or other.user,
             role=self.role or other.role,
             action=self.action or other.action,
             target=self.target or other.target
-        )
+        )._condense()
 
     def _condense(self):
 
@@ -155,9 +179,62 @@ class MessagePacket(Packet):
                 message.append(component)
 
         self.message = message
+        self._shared = False
 
         return self
 
+    @classmethod
+    def _from_components(cls, message, *, user="", role=1, action=False,
+                         target=None):
+        """Create a packet which adopts already-normalised components.
+
+        ``message`` must be a :obj:`list` of :obj:`MessageComponent`, and is
+        used as-is, without being copied or condensed.
+        """
+
+        packet = cls.__new__(cls)
+        Packet.__init__(packet)
+
+        packet.message = message
+
+        packet.user = user
+        packet.role = role
+        packet.action = action
+        packet.target = target
+
+        return packet
+
+    def _derive(self, message):
+        """Create a packet with the attributes of :obj:`self`."""
+
+        return MessagePacket._from_components(
+            message,
+            user=self.user,
+            role=self.role,
+            action=self.action,
+            target=self.target
+        )
+
+    def _write(self, index, component):
+        """Replace a component, copying shared components first."""
+
+        if self._shared:
+            self.message = self.message.copy()
+            self._shared = False
+
+        self.message[index] = component
+        self._plain = self._tokens = None
+
+    @property
+    def message(self):
+        """:obj:`list` of :obj:`MessageComponent` making up the packet."""
+        return self._message
+
+    @message.setter
+    def message(self, message):
+        self._message = message
+        self._plain = self._tokens = None
+
     @property
     def text(self):
         """Pure text representation of the packet.
@@ -174,6 +251,53 @@ class MessagePacket(Packet):
         """
         return ''.join(chunk.text for chunk in self.message)
 
+    @property
+    def plain(self):
+        """Text representation of only the ``text`` components.
+
+        Computed once, and reused until the packet is modified.
+
+        Returns
+        -------
+        :obj:`str`
+            Joined ``text`` of every ``text`` component.
+
+        Examples
+        --------
+        >>> MessagePacket("Hello, world! ", ("emoji", "😃")).plain
+        'Hello, world! '
+        """
+
+        if self._plain is None:
+            self._plain = ''.join(
+                chunk.text for chunk in self.message if chunk.type == "text")
+        return self._plain
+
+    @property
+    def tokens(self):
+        """Whitespace-separated words of the packet.
+
+        Computed once, and reused until the packet is modified, so every
+        handler may inspect the words of a message without splitting it again.
+
+        Returns
+        -------
+        :obj:`tuple` of :obj:`MessageToken`
+            The words, as returned by :meth:`split`.
+
+        Examples
+        --------
+        >>> [token.lower for token in MessagePacket("Hello, World!").tokens]
+        ['hello,', 'world!']
+        """
+
+        if self._tokens is None:
+            self._tokens = tuple(
+                MessageToken(word, text, text.lower())
+                for word in self.split() for text in (word.text,)
+            )
+        return self._tokens
+
     @property
     def json(self):
         """JSON representation of the packet.
@@ -250,9 +374,12 @@ class MessagePacket(Packet):
         :obj:`MessagePacket`
             Copy of :obj:`self`, with replaced attributes as specified in
             ``args`` and ``kwargs``.
-        """
 
-        _args = args or self.message
+        Note
+        ----
+        If no ``args`` are provided, the copy shares its components with
+        :obj:`self` until either packet is modified.
+        """
 
         _kwargs = {
             "user": self.user,
@@ -262,7 +389,13 @@ class MessagePacket(Packet):
         }
         _kwargs.update(kwargs)
 
-        return MessagePacket(*_args, **_kwargs)
+        if args:
+            return MessagePacket(*args, **_kwargs)
+
+        packet = MessagePacket._from_components(self.message, **_kwargs)
+        packet._shared = self._shared = True
+
+        return packet
 
     def replace(self, **values):
         """Replace text in packet.
@@ -293,15 +426,30 @@ class MessagePacket(Packet):
         ...     "world": "Python 2"
         ... }).text
         'Goodbye, Python 2!'
+
+        Every component is scanned once, so replaced text is never matched
+        again by another key.
+
+        >>> MessagePacket("a b").replace(a="b", b="c").text
+        'b c'
         """
+
+        values = {old: new for old, new in values.items() if new is not None}
+        if not values:
+            return self
+
+        pattern = _compile_replacements(frozenset(values))
+
+        def sub_value(match):
+            """Substitute the replacement for a matched key."""
+            return values[match.group()]
+
         for index, chunk in enumerate(self.message):
-            for old, new in values.items():
-                if new is not None:
-                    new_text = chunk.text.replace(old, new)
-                    new_data = new_text if chunk.type == "text" else chunk.data
-                    self.message[index] = self.message[index]._replace(
-                        data=new_data, text=new_text)
-                    chunk = self.message[index]
+            new_text = pattern.sub(sub_value, chunk.text)
+            if new_text != chunk.text:
+                new_data = new_text if chunk.type == "text" else chunk.data
+                self._write(index, chunk._replace(
+                    data=new_data, text=new_text))
         return self
 
     def sub(self, pattern, repl):
@@ -333,8 +481,9 @@ class MessagePacket(Packet):
         """
         for index, chunk in enumerate(self.message):
             if chunk.type in ("text", "url"):
-                self.message[index] = self.message[index]._replace(
-                    text=re.sub(pattern, repl, chunk.text))
+                new_text = re.sub(pattern, repl, chunk.text)
+                if new_text != chunk.text:
+                    self._write(index, chunk._replace(text=new_text))
         return self
 
     def split(self, separator=' ', maximum=None):
@@ -411,12 +560,12 @@ class MessagePacket(Packet):
         result.append(components)
 
         result = [
-            filter(lambda component: component.text, message)
+            [component for component in message if component.text]
             for message in result
             if any(component.text for component in message)
         ]
 
-        return [self.copy(*message) for message in result]
+        return [self._derive(message)._condense() for message in result]
 
     @classmethod
     def join(cls, *packets, separator=''):
@@ -86,3 +86,9 @@ class SepalParser:
 
         return [Packet("config", key=key, values=values)
                 for key, values in packet["data"].items()]
+
+    async def parse_trust(self, packet):
+        """Parse the incoming trust packets."""
+
+        return Packet("trust", user_id=packet["data"]["userId"],
+                      trusted=packet["data"]["trusted"])
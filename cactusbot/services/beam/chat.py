@@ -1,17 +1,107 @@
 """Interact with Beam chat."""
 
 
+import asyncio
+import heapq
 import itertools
 import json
 import logging
+import time
+import unicodedata
+from collections import Counter, OrderedDict, defaultdict, namedtuple
+from json.encoder import encode_basestring_ascii
 
 from .. import WebSocket
+from ..metrics import Histogram
+from ..ratelimit import TokenBucket
+
+ZERO_WIDTH_JOINER = '\u200d'
+
+QueuedPacket = namedtuple("QueuedPacket", (
+    "priority", "sequence", "envelope", "packet_id", "method", "arguments",
+    "max_length", "queued", "future"))
+
+
+def split_message(message, max_length):
+    """Split a message into chunks, at spaces where possible.
+
+    Words longer than ``max_length`` are split, but never between a
+    character and a following combining mark or joiner.
+
+    Parameters
+    ----------
+    message : :obj:`str`
+        The message to split.
+    max_length : :obj:`int`
+        The maximum length of each chunk.
+
+    Examples
+    --------
+    >>> list(split_message("Hello there, world!", 12))
+    ['Hello there,', 'world!']
+    >>> list(split_message("abcdefgh", 3))
+    ['abc', 'def', 'gh']
+    """
+
+    while len(message) > max_length:
+
+        index = message.rfind(' ', 0, max_length + 1)
+        if index > 0:
+            yield message[:index]
+            message = message[index + 1:]
+            continue
+
+        index = max_length
+        while index > 1 and (
+                unicodedata.category(message[index]) in ("Mn", "Me", "Cf")
+                or message[index - 1] == ZERO_WIDTH_JOINER):
+            index -= 1
+
+        yield message[:index]
+        message = message[index:]
+
+    if message:
+        yield message
 
 
 class BeamChat(WebSocket):
-    """Interact with Beam chat."""
+    """Interact with Beam chat.
+
+    Packets are sent through a queue, paced by a token bucket. Packets with
+    a higher priority are sent first, and adjacent plain messages of the
+    same priority are merged while they fit in one message. Actions and
+    commands, which start with ``/``, are never merged. Authentication
+    packets bypass the queue. Once ``max_depth`` packets are queued, the
+    newest packet of the lowest priority is dropped.
+
+    Every packet sent is given a new ID, and Beam's reply to it is matched
+    by that ID, to measure the round-trip time of each method. After
+    reconnecting, packets which were not answered are sent again, paced by
+    the token bucket. While disconnected, queued packets wait in the queue,
+    and are sent once unanswered packets have been sent again.
+
+    Parameters
+    ----------
+    channel : :obj:`int`
+        The ID of the channel.
+    endpoints : :obj:`str`
+        The chat endpoints.
+    rate : :obj:`float`
+        The number of packets which may be sent per second.
+    burst : :obj:`int`
+        The number of packets which may be sent at once.
+    on_backlog
+        Function called with the depth of the queue, whenever it changes.
+    max_depth : :obj:`int`
+        The maximum number of queued packets.
+    reply_timeout : :obj:`float`
+        The number of seconds to wait for Beam to reply to a packet.
+    """
 
-    def __init__(self, channel, *endpoints):
+    HIGH, NORMAL, LOW = range(3)
+
+    def __init__(self, channel, *endpoints, rate=2, burst=5,
+                 on_backlog=None, max_depth=100, reply_timeout=10):
         super().__init__(*endpoints)
 
         self.logger = logging.getLogger(__name__)
@@ -21,27 +111,317 @@ class BeamChat(WebSocket):
 
         self._packet_counter = itertools.count()
 
-    async def send(self, *args, max_length=360, **kwargs):
-        """Send a packet."""
+        self.bucket = TokenBucket(rate, burst)
+        self.on_backlog = on_backlog
+
+        self.max_depth = max_depth
+
+        self._queue = []
+        self._sequence = itertools.count()
+        self._writer = None
+
+        self.reply_timeout = reply_timeout
+        self._pending = OrderedDict()
+
+        self.latency = Histogram()
+        self.round_trip = defaultdict(Histogram)
+        self.stats = Counter()
 
-        # TODO: lock before auth
+    @property
+    def depth(self):
+        """The number of queued packets."""
+        return len(self._queue)
+
+    async def send(self, *args, max_length=360, priority=NORMAL, wait=False,
+                   **kwargs):
+        """Queue a packet to be sent.
+
+        Parameters
+        ----------
+        *args
+            The arguments of the method.
+        max_length : :obj:`int`
+            The maximum length of a message. Longer messages are split, at
+            spaces where possible.
+        priority : :obj:`int`
+            The priority of the packet: :attr:`HIGH`, :attr:`NORMAL`, or
+            :attr:`LOW`.
+        wait : :obj:`bool`
+            Whether to wait for Beam to reply to every packet sent.
+        **kwargs
+            Fields of the packet, such as ``method``. If a message is split,
+            an explicit ``id`` is given to the first packet only, and the
+            rest are given new IDs.
+
+        Returns
+        -------
+        :obj:`list` of :obj:`dict` or :obj:`None`
+            If ``wait`` is :obj:`True`, the reply to each packet sent.
+
+        Raises
+        ------
+        :exc:`asyncio.TimeoutError`
+            If ``wait`` is :obj:`True`, and Beam does not reply within
+            :attr:`reply_timeout` seconds of the packets being queued.
+        """
 
         packet = {
             "type": "method",
-            "method": "msg",
-            "arguments": args,
-            "id": kwargs.get("id") or self._packet_id
+            "method": "msg"
         }
 
         packet.update(kwargs)
+        packet_id = packet.pop("id", None)
+
+        method = packet["method"]
+        envelope = json.dumps(packet)[:-1] + ', "id": '
+
+        if method == "auth":
+            packet_id = packet_id or self._packet_id
+            packet = "{}{}, \"arguments\": {}}}".format(
+                envelope, packet_id, json.dumps(args))
+            future = self._expect(
+                packet_id, method, packet, None if wait else [])
+            await super().send(packet)
+            if wait:
+                return [await asyncio.wait_for(future, self.reply_timeout)]
+            return None
+
+        futures = []
+
+        if method == "msg":
+            for message in args:
+                for chunk in split_message(message, max_length):
+                    futures.append(self._enqueue(
+                        priority, envelope, packet_id, method, (chunk,),
+                        max_length, wait))
+                    packet_id = None
+        else:
+            futures.append(self._enqueue(
+                priority, envelope, packet_id, method, args, None, wait))
+
+        self._start()
+
+        if wait:
+            return await asyncio.wait_for(
+                asyncio.gather(*futures), self.reply_timeout)
+
+    def _enqueue(self, priority, envelope, packet_id, method, arguments,
+                 max_length, wait):
+
+        future = asyncio.Future() if wait else None
+        entry = QueuedPacket(
+            priority, next(self._sequence), envelope, packet_id, method,
+            arguments, max_length, time.time(), future)
+
+        queue = self._queue
+        if len(queue) >= self.max_depth:
+            newest = max(queue)
+            if entry > newest:
+                self._drop(entry)
+                return future
+            queue.remove(newest)
+            heapq.heapify(queue)
+            self._drop(newest)
+
+        heapq.heappush(queue, entry)
+        self._report()
+
+        return future
+
+    def _drop(self, entry):
+
+        self.logger.warning("Chat queue full. Dropping %s.", entry.arguments)
+        self.stats["dropped"] += 1
+        if entry.future is not None:
+            entry.future.cancel()
 
-        if packet["method"] == "msg":
-            for message in packet.copy()["arguments"]:
-                for index in range(0, len(message), max_length):
-                    packet["arguments"] = (message[index:index + max_length],)
-                    await super().send(json.dumps(packet))
+    def _report(self):
+        if self.on_backlog is not None:
+            self.on_backlog(self.depth)
+
+    def _merge(self, entry):
+
+        arguments = entry.arguments
+        futures = [entry.future] if entry.future is not None else []
+
+        if entry.max_length is None or arguments[0].startswith('/'):
+            return arguments, futures
+
+        queue = self._queue
+        while queue and queue[0].priority == entry.priority and \
+                queue[0].max_length is not None and \
+                not queue[0].arguments[0].startswith('/'):
+            message = arguments[0] + ' ' + queue[0].arguments[0]
+            if len(message) > entry.max_length:
+                break
+            merged = heapq.heappop(queue)
+            if merged.future is not None:
+                futures.append(merged.future)
+            arguments = (message,)
+            self.stats["merged"] += 1
+
+        return arguments, futures
+
+    @property
+    def _paused(self):
+        return self.websocket is None or self.websocket.closed
+
+    def _start(self):
+        if self._writer is None and self._queue and not self._paused:
+            self._writer = asyncio.ensure_future(self._write())
+
+    async def _write(self):
+
+        try:
+            while self._queue and not self._paused:
+                delay = self.bucket.take()
+                if delay:
+                    await asyncio.sleep(delay)
+                if self._paused:
+                    break
+
+                entry = heapq.heappop(self._queue)
+                arguments, futures = self._merge(entry)
+                self._report()
+
+                packet_id = entry.packet_id or self._packet_id
+                if entry.max_length is None:
+                    arguments = json.dumps(arguments)
+                else:
+                    arguments = "[{}]".format(
+                        encode_basestring_ascii(arguments[0]))
+                packet = "{}{}, \"arguments\": {}}}".format(
+                    entry.envelope, packet_id, arguments)
+
+                self._expect(packet_id, entry.method, packet, futures)
+
+                try:
+                    await super().send(packet)
+                except Exception:
+                    self.logger.exception("Failed to send %s.", packet)
+                    self._pending.pop(packet_id, None)
+                    for future in futures:
+                        future.cancel()
+                    continue
+
+                self.latency.observe(time.time() - entry.queued)
+                self.stats["sent"] += 1
+        finally:
+            self._writer = None
+
+    def _expect(self, packet_id, method, packet, futures=None):
+
+        now = time.time()
+        self._sweep(now)
+
+        if futures is None:
+            futures = [asyncio.Future()]
+        self._pending[packet_id] = (method, now, packet, futures)
+
+        return futures[0] if futures else None
+
+    def _sweep(self, now):
+
+        pending = self._pending
+        while pending:
+            sent = next(iter(pending.values()))[1]
+            if sent > now - self.reply_timeout:
+                break
+            _, (_, _, _, stale) = pending.popitem(last=False)
+            self.stats["timeouts"] += 1
+            for future in stale:
+                if not future.done():
+                    future.set_exception(asyncio.TimeoutError())
+
+    def _reply(self, packet):
+
+        entry = self._pending.pop(packet.get("id"), None)
+        if entry is None:
+            return
+
+        method, sent, _, futures = entry
+        self.round_trip[method].observe(time.time() - sent)
+
+        if packet.get("error") is not None:
+            self.stats["errors"] += 1
         else:
-            await super().send(json.dumps(packet))
+            self.stats["replies"] += 1
+
+        for future in futures:
+            if not future.done():
+                future.set_result(packet)
+
+    def metrics(self):
+        """Summarize the queue and round-trip metrics.
+
+        Returns
+        -------
+        :obj:`dict`
+            The queue depth, queue latency, round-trip latency of each
+            method and of heartbeat pings, event loop lag, the latency and
+            failure count of each endpoint, and counters.
+        """
+
+        def summarize(histogram):
+            return {
+                "count": histogram.count,
+                "mean": histogram.mean,
+                "p50": histogram.percentile(50),
+                "p99": histogram.percentile(99),
+                "max": histogram.maximum
+            }
+
+        return {
+            "depth": self.depth,
+            "pending": len(self._pending),
+            "latency": summarize(self.latency),
+            "round_trip": {method: summarize(histogram) for
+                           method, histogram in self.round_trip.items()},
+            "heartbeat": summarize(self.heartbeat),
+            "lag": summarize(self.lag),
+            "latencies": dict(self.latencies),
+            "failures": dict(self.failures),
+            "stats": dict(self.stats)
+        }
+
+    async def resend(self):
+        """Send packets which were not answered before reconnecting.
+
+        Packets sent more than :attr:`reply_timeout` seconds ago are
+        considered lost, and are not sent again. Packets queued while
+        disconnected are sent afterwards.
+        """
+
+        pending = self._pending
+        self._sweep(time.time())
+
+        unanswered = [
+            (packet_id, packet)
+            for packet_id, (method, _, packet, _) in pending.items()
+            if method != "auth"
+        ]
+        seen = set(packet for _, packet in unanswered)
+        packets = unanswered + [
+            (None, packet) for packet in self.replay if packet not in seen]
+        self.replay.clear()
+
+        if packets:
+            self.logger.info("Resending %s packets.", len(packets))
+
+        for packet_id, packet in packets[-self.replay.maxlen:]:
+            delay = self.bucket.take()
+            if delay:
+                await asyncio.sleep(delay)
+            await super().send(packet)
+            self.stats["resent"] += 1
+
+            if packet_id in pending:
+                method, _, _, futures = pending[packet_id]
+                pending[packet_id] = (method, time.time(), packet, futures)
+                pending.move_to_end(packet_id)
+
+        self._start()
 
     async def initialize(self, *auth):
         """Send an authentication packet."""
@@ -65,6 +445,9 @@ class BeamChat(WebSocket):
                 self.logger.error(packet)
             else:
                 self.logger.debug(packet)
+            if packet.get("type") == "reply":
+                self._reply(packet)
+                return None
             return packet
 
     @property
@@ -14,6 +14,9 @@ from .parser import BeamParser
 class BeamHandler:
     """Handle data from Beam services."""
 
+    #: Minimum number of seconds between ``backlog`` events.
+    BACKLOG_INTERVAL = 0.5
+
     def __init__(self, channel, token, handlers):
 
         self.logger = logging.getLogger(__name__)
@@ -30,6 +33,10 @@ class BeamHandler:
         self.chat = None
         self.constellation = None
 
+        self._depth = 0
+        self._reported = 0
+        self._backlog_handle = None
+
         self.chat_events = {
             "ChatMessage": "message",
             "UserJoin": "join",
@@ -62,7 +69,8 @@ class BeamHandler:
         if "authkey" not in chat:
             self.logger.error("Failed to authenticate with Beam!")
 
-        self.chat = BeamChat(channel["id"], *chat["endpoints"])
+        self.chat = BeamChat(channel["id"], *chat["endpoints"],
+                             on_backlog=self._backlog)
         await self.chat.connect(
             bot_id, partial(self.api.get_chat, channel["id"]))
         asyncio.ensure_future(self.chat.read(self.handle_chat))
@@ -114,21 +122,39 @@ class BeamHandler:
     async def handle(self, event, data):
         """Handle event."""
 
+        priority = BeamChat.NORMAL if event == "message" else BeamChat.LOW
+
         for response in await self.handlers.handle(event, data):
             if isinstance(response, MessagePacket):
                 args, kwargs = self.parser.synthesize(response)
-                await self.send(*args, **kwargs)
+                await self.send(*args, priority=priority, **kwargs)
 
             elif isinstance(response, BanPacket):
                 if response.duration:
                     await self.send(
                         response.user,
                         response.duration,
-                        method="timeout"
+                        method="timeout",
+                        priority=BeamChat.HIGH
                     )
                 else:
                     pass  # TODO: full ban
 
+    def _backlog(self, depth):
+
+        self._depth = depth
+        if self._backlog_handle is None:
+            self._backlog_handle = asyncio.get_event_loop().call_later(
+                self.BACKLOG_INTERVAL, self._report_backlog)
+
+    def _report_backlog(self):
+
+        self._backlog_handle = None
+        if self._depth != self._reported:
+            self._reported = self._depth
+            asyncio.ensure_future(self.handle(
+                "backlog", Packet("backlog", depth=self._depth)))
+
     async def send(self, *args, **kwargs):
         """Send a packet to Beam."""
 
@@ -3,7 +3,8 @@
 import json
 from os import path
 
-from ...packets import EventPacket, MessagePacket
+from ...packets import EventPacket, MessagePacket, Packet
+from ...packets.message import MessageComponent
 
 
 class BeamParser:
@@ -26,44 +27,39 @@ class BeamParser:
               encoding="utf-8") as file:
         EMOJI = json.load(file)
 
+    EMOJI_NAMES = {emoji: name for name, emoji in EMOJI.items()}
+
     @classmethod
     def parse_message(cls, packet):
-        """Parse a Beam message packet."""
+        """Parse a Beam message packet.
+
+        The message is decoded lazily. See :obj:`BeamMessagePacket`.
+        """
+
+        return BeamMessagePacket(packet)
+
+    @classmethod
+    def parse_components(cls, components):
+        """Parse Beam message components into :obj:`MessageComponent`."""
 
         message = []
-        for component in packet["message"]["message"]:
-            chunk = {
-                "type": component["type"],
-                "data": "",
-                "text": component["text"]
-            }
-            if component["type"] == "emoticon":
-                chunk["type"] = "emoji"
-                chunk["data"] = cls.EMOJI.get(component["text"], "")
-                message.append(chunk)
-            elif component["type"] == "inaspacesuit":
-                chunk["type"] = "emoji"
-                chunk["data"] = ""
-                message.append(chunk)
-            elif component["type"] == "link":
-                chunk["type"] = "url"
-                chunk["data"] = component["url"]
-                message.append(chunk)
-            elif component["type"] == "tag":
-                chunk["data"] = component["username"]
-                message.append(chunk)
-            elif component["text"]:
-                chunk["data"] = component["text"]
-                message.append(chunk)
-
-        return MessagePacket(
-            *message,
-            user=packet["user_name"],
-            role=cls.ROLES[packet["user_roles"][0]],
-            action=packet["message"]["meta"].get("me", False),
-            target=packet["message"]["meta"].get(
-                "whisper", None) and packet["target"]
-        )
+        for component in components:
+            component_type = component["type"]
+            text = component["text"]
+            if component_type == "emoticon":
+                message.append(MessageComponent(
+                    "emoji", cls.EMOJI.get(text, ""), text))
+            elif component_type == "inaspacesuit":
+                message.append(MessageComponent("emoji", "", text))
+            elif component_type == "link":
+                message.append(MessageComponent("url", component["url"], text))
+            elif component_type == "tag":
+                message.append(MessageComponent(
+                    "tag", component["username"], text))
+            elif text:
+                message.append(MessageComponent(component_type, text, text))
+
+        return message
 
     @classmethod
     def parse_follow(cls, packet):
@@ -110,24 +106,105 @@ class BeamParser:
     def synthesize(cls, packet):
         """Create a Beam packet from a :obj:`MessagePacket`."""
 
-        message = ""
-        emoji = dict(zip(cls.EMOJI.values(), cls.EMOJI.keys()))
-
-        if packet.action:
-            message = "/me "
+        message = ["/me "] if packet.action else []
+        components = packet.message
 
-        for index, component in enumerate(packet):
+        for index, component in enumerate(components):
             if component.type == "emoji":
-                message += emoji.get(component.data, component.text)
-                if (index < len(packet) - 1 and
-                        not packet[index + 1].startswith(' ')):
-                    message += ' '
+                message.append(
+                    cls.EMOJI_NAMES.get(component.data, component.text))
+                if (index < len(components) - 1 and
+                        not components[index + 1].text.startswith(' ')):
+                    message.append(' ')
             elif component.type == "tag":
-                message += '@' + component.data
+                message.append('@' + component.data)
             else:
-                message += component.text
+                message.append(component.text)
+
+        message = ''.join(message)
 
         if packet.target:
             return (packet.target, message), {"method": "whisper"}
 
         return (message,), {}
+
+
+class BeamMessagePacket(MessagePacket):
+    """:obj:`MessagePacket` which decodes a Beam chat message on first use.
+
+    The sender, action and target are read immediately. The components and
+    role are only decoded once a handler accesses them, and :attr:`text` and
+    :attr:`plain` are read straight from the raw message until then, so
+    handlers which only log messages or look for commands never pay for
+    decoding.
+
+    Parameters
+    ----------
+    packet : :obj:`dict`
+        The ``data`` of a Beam ``ChatMessage`` event.
+    """
+
+    def __init__(self, packet):
+        Packet.__init__(self, "MessagePacket")
+
+        self._packet = packet
+        self._message = None
+        self._role = None
+
+        meta = packet["message"]["meta"]
+
+        self.user = packet["user_name"]
+        self.action = meta.get("me", False)
+        self.target = meta.get("whisper", None) and packet["target"]
+
+    @property
+    def message(self):
+        """:obj:`list` of :obj:`MessageComponent` making up the packet."""
+
+        if self._message is None:
+            self.message = BeamParser.parse_components(
+                self._packet["message"]["message"])
+            if self._message:
+                self._condense()
+        return self._message
+
+    @message.setter
+    def message(self, message):
+        MessagePacket.message.fset(self, message)
+
+    @property
+    def role(self):
+        """The role ID of the sender."""
+
+        if self._role is None:
+            self._role = BeamParser.ROLES[self._packet["user_roles"][0]]
+        return self._role
+
+    @role.setter
+    def role(self, role):
+        self._role = role
+
+    @property
+    def text(self):
+        """Pure text representation of the packet."""
+
+        if self._message is None:
+            return ''.join(
+                component["text"]
+                for component in self._packet["message"]["message"]
+            )
+        return super().text
+
+    @property
+    def plain(self):
+        """Text representation of only the ``text`` components."""
+
+        if self._message is None:
+            if self._plain is None:
+                self._plain = ''.join(
+                    component["text"]
+                    for component in self._packet["message"]["message"]
+                    if component["type"] == "text"
+                )
+            return self._plain
+        return super().plain
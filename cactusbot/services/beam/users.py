@@ -0,0 +1,184 @@
+"""Resolve Beam users."""
+
+import asyncio
+import logging
+from collections import Counter
+
+from ...cache import ExpiringCache
+from ..ratelimit import TokenBucket
+from .api import BeamAPI
+
+
+class BeamUsers:
+    """Resolve Beam usernames to user IDs.
+
+    Resolved IDs are cached, as are usernames which do not exist, and every
+    lookup shares a single connection pool. Concurrent lookups for the same
+    username share a single request.
+
+    Prefetching is best-effort. At most ``max_prefetch`` usernames wait to
+    be prefetched, and lookups are paced to ``prefetch_rate`` per second.
+    If Beam rate limits a lookup, waiting prefetches are dropped.
+
+    Parameters
+    ----------
+    api : :obj:`BeamAPI` or :obj:`None`
+        The API used for lookups. If :obj:`None`, one is created on first use.
+    maximum : :obj:`int`
+        The maximum number of cached usernames.
+    ttl : :obj:`float`
+        The number of seconds for which to cache a resolved user ID.
+    missing_ttl : :obj:`float`
+        The number of seconds for which to cache a username which does not
+        exist.
+    batch_delay : :obj:`float`
+        The number of seconds to collect prefetched usernames for, before
+        resolving them together.
+    batch_size : :obj:`int`
+        The maximum number of concurrent prefetch lookups.
+    max_prefetch : :obj:`int`
+        The maximum number of usernames waiting to be prefetched.
+    prefetch_rate : :obj:`float`
+        The number of prefetch lookups which may be made per second.
+    """
+
+    MISSING = 0
+
+    def __init__(self, api=None, *, maximum=4096, ttl=3600, missing_ttl=300,
+                 batch_delay=1, batch_size=16, max_prefetch=256,
+                 prefetch_rate=8):
+
+        self.logger = logging.getLogger(__name__)
+
+        self._api = api
+
+        self.cache = ExpiringCache(maximum=maximum, ttl=ttl)
+        self.missing_ttl = missing_ttl
+
+        self.batch_delay = batch_delay
+        self.batch_size = batch_size
+        self.max_prefetch = max_prefetch
+        self.bucket = TokenBucket(prefetch_rate, batch_size)
+
+        self._pending = {}
+        self._prefetch = set()
+        self._batch = None
+
+        self.stats = Counter()
+
+    @property
+    def api(self):
+        """API used for lookups."""
+
+        if self._api is None:
+            self._api = BeamAPI()
+        return self._api
+
+    async def get_id(self, username):
+        """Get the ID of a user.
+
+        Parameters
+        ----------
+        username : :obj:`str`
+            The username to resolve. A leading ``@`` is ignored.
+
+        Returns
+        -------
+        :obj:`int` or :obj:`None`
+            The ID of the user, or :obj:`None` if the user does not exist.
+
+        Raises
+        ------
+        :obj:`LookupError`
+            If the user could not be resolved, for example because Beam
+            rate limited the lookup.
+        """
+
+        key = username.lstrip('@').lower()
+
+        user_id = self.cache.get(key)
+        if user_id is not None:
+            return user_id or None
+
+        if key not in self._pending:
+            self._pending[key] = asyncio.ensure_future(self._fetch(key))
+
+        return (await asyncio.shield(self._pending[key])) or None
+
+    async def _fetch(self, key):
+
+        try:
+            response = await self.api.get("/channels/{username}".format(
+                username=key))
+
+            if response.status == 404:
+                self.cache.set(key, self.MISSING, ttl=self.missing_ttl)
+                return self.MISSING
+
+            if response.status != 200:
+                self.stats["errors"] += 1
+                if response.status == 429 and self._prefetch:
+                    self.logger.warning(
+                        "Rate limited. Dropping %s prefetches.",
+                        len(self._prefetch))
+                    self.stats["dropped"] += len(self._prefetch)
+                    self._prefetch.clear()
+                else:
+                    self.logger.warning("Failed to resolve %s: %s.",
+                                        key, response.status)
+                raise LookupError("Failed to resolve {key}: {status}.".format(
+                    key=key, status=response.status))
+
+            user_id = (await response.json())["id"]
+            self.cache.set(key, user_id)
+            return user_id
+
+        finally:
+            del self._pending[key]
+
+    def prefetch(self, *usernames):
+        """Resolve users in the background, in batches.
+
+        Parameters
+        ----------
+        *usernames : :obj:`str`
+            The usernames to resolve.
+        """
+
+        for username in usernames:
+            key = username.lstrip('@').lower()
+            if key in self._prefetch or key in self.cache or \
+                    key in self._pending:
+                continue
+            if len(self._prefetch) >= self.max_prefetch:
+                self.stats["dropped"] += 1
+                continue
+            self._prefetch.add(key)
+
+        if self._prefetch and self._batch is None:
+            self._batch = asyncio.ensure_future(self._prefetch_batch())
+
+    async def _prefetch_batch(self):
+
+        await asyncio.sleep(self.batch_delay)
+
+        try:
+            while self._prefetch:
+                batch = [self._prefetch.pop() for _ in range(
+                    min(self.batch_size, len(self._prefetch)))]
+                delay = max(self.bucket.take() for _ in batch)
+                if delay:
+                    await asyncio.sleep(delay)
+                results = await asyncio.gather(
+                    *(self.get_id(username) for username in batch),
+                    return_exceptions=True)
+                for username, result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        self.logger.debug(
+                            "Failed to prefetch %s: %s", username, result)
+        finally:
+            self._batch = None
+
+
+#: Username resolver shared by handlers and commands.
+USERS = BeamUsers()
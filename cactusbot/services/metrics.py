@@ -0,0 +1,84 @@
+"""Record service metrics."""
+
+import math
+
+
+class Histogram:
+    """Distribution of observed values, counted in logarithmic buckets.
+
+    Memory use is bounded by the range of the values, not their number.
+
+    Parameters
+    ----------
+    resolution : :obj:`float`
+        The smallest value distinguished from zero.
+    base : :obj:`float`
+        The ratio between the bounds of consecutive buckets.
+
+    Examples
+    --------
+    >>> latency = Histogram()
+    >>> for value in (0.01, 0.02, 0.03, 0.5):
+    ...     latency.observe(value)
+    >>> latency.count
+    4
+    >>> latency.percentile(50) <= 0.032
+    True
+    """
+
+    def __init__(self, resolution=0.001, base=2):
+
+        self.resolution = resolution
+        self.base = base
+
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.maximum = 0
+
+    def __repr__(self):
+        return "<Histogram: count={}, mean={:.4f}, maximum={:.4f}>".format(
+            self.count, self.mean, self.maximum)
+
+    def observe(self, value):
+        """Record a value."""
+
+        if value <= self.resolution:
+            bucket = 0
+        else:
+            bucket = math.ceil(math.log(value / self.resolution, self.base))
+
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    @property
+    def mean(self):
+        """The mean of the values."""
+        return self.total / self.count if self.count else 0
+
+    def percentile(self, percent):
+        """Estimate a percentile of the values.
+
+        Parameters
+        ----------
+        percent : :obj:`float`
+            The percentile, from ``0`` to ``100``.
+
+        Returns
+        -------
+        :obj:`float`
+            The upper bound of the bucket containing the percentile.
+        """
+
+        rank = self.count * percent / 100
+        seen = 0
+
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.resolution * self.base ** bucket,
+                           self.maximum)
+
+        return self.maximum
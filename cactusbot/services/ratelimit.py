@@ -0,0 +1,55 @@
+"""Limit the rate of service requests."""
+
+import time
+
+
+class TokenBucket:
+    """Token bucket rate limiter.
+
+    Tokens are added at ``rate`` per second, up to ``capacity``. Taking a
+    token from an empty bucket borrows it, and returns how long to wait
+    before using it, so waiting callers are served in order.
+
+    Parameters
+    ----------
+    rate : :obj:`float`
+        The number of tokens added per second.
+    capacity : :obj:`float`
+        The maximum number of tokens, which may be used in a burst.
+    clock
+        Function returning the current time, in seconds.
+
+    Examples
+    --------
+    >>> bucket = TokenBucket(rate=1, capacity=2, clock=lambda: 0)
+    >>> [bucket.take() for _ in range(4)]
+    [0, 0, 1.0, 2.0]
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+
+        self.tokens = capacity
+        self.updated = clock()
+
+    def take(self):
+        """Take a token.
+
+        Returns
+        -------
+        :obj:`float`
+            The number of seconds to wait before using the token.
+        """
+
+        now = self.clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0
+        return -self.tokens / self.rate
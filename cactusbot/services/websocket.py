@@ -6,12 +6,83 @@ import asyncio
 
 import itertools
 
-from aiohttp import ClientSession
+import random
+
+import time
+
+from collections import Counter, deque
+
+from aiohttp import ClientSession, WSMsgType
 from aiohttp.errors import DisconnectedError, HttpProcessingError, ClientError
 
+from .metrics import Histogram
+
 
 class WebSocket(ClientSession):
-    """Interact with WebSockets safely."""
+    """Interact with WebSockets safely.
+
+    The handshake latency of each endpoint is measured, as a moving average
+    in :attr:`latencies`. Healthy endpoints are preferred, fastest first. An
+    endpoint which fails to connect, or whose connection is lost, is
+    avoided until every other endpoint has failed as often, or until a
+    connection to it answers a heartbeat ping. Every endpoint is probed
+    before each connection, and every :attr:`PROBE_INTERVAL` seconds while
+    connected. If the connected endpoint has become more than
+    :attr:`DEGRADED` times slower than the fastest, the connection is moved.
+
+    Reconnection attempts are delayed by a random time, up to an
+    exponentially growing bound, so that many connections lost at once do
+    not retry in step. Packets sent while disconnected are buffered, up to
+    :attr:`REPLAY_SIZE`, and sent once the connection is reestablished.
+
+    While connected, the WebSocket is pinged every :attr:`HEARTBEAT_INTERVAL`
+    seconds, and the round-trip time of each ping is recorded in
+    :attr:`heartbeat`. A connection which does not answer a ping within
+    :attr:`HEARTBEAT_TIMEOUT` seconds is closed, and reestablished.
+    Separately, the lag of the event loop is sampled every
+    :attr:`LAG_INTERVAL` seconds, and recorded in :attr:`lag`, so slow pings
+    caused by the network can be told from those caused by a busy loop. The
+    loop is sampled by a single task, and :attr:`lag` is shared, however
+    many WebSockets are connected.
+
+    Parameters
+    ----------
+    endpoints : :obj:`str`
+        The WebSocket endpoints.
+    """
+
+    #: Weight of the latest handshake time in the average latency.
+    SMOOTHING = 0.3
+
+    #: Number of seconds between probes of every endpoint, while connected.
+    PROBE_INTERVAL = 300
+
+    #: Ratio of the latency of the connected endpoint to that of the fastest,
+    #: above which the connection is moved.
+    DEGRADED = 2
+
+    #: Maximum number of packets buffered while disconnected.
+    REPLAY_SIZE = 64
+
+    #: Number of seconds between heartbeat pings.
+    HEARTBEAT_INTERVAL = 15
+
+    #: Number of seconds to wait for a pong.
+    HEARTBEAT_TIMEOUT = 10
+
+    #: Number of seconds between samples of event loop lag.
+    LAG_INTERVAL = 1
+
+    #: Event loop lag, in seconds, above which a warning is logged.
+    LAG_WARNING = 0.5
+
+    ERRORS = (DisconnectedError, HttpProcessingError, ClientError)
+
+    #: Lag of the event loop, shared by every WebSocket.
+    lag = Histogram()
+
+    _lag_task = None
+    _lag_users = set()
 
     def __init__(self, *endpoints):
         super().__init__()
@@ -25,7 +96,17 @@ class WebSocket(ClientSession):
         self._init_args = ()
         self._init_kwargs = {}
 
-        self._endpoint_cycle = itertools.cycle(endpoints)
+        self.endpoints = endpoints
+        self.endpoint = None
+        self.latencies = dict.fromkeys(endpoints)
+        self.failures = Counter()
+
+        self.replay = deque(maxlen=self.REPLAY_SIZE)
+
+        self.heartbeat = Histogram()
+
+        self._pong = None
+        self._heartbeat_task = None
 
     async def connect(self, *args, base=2, maximum=60, **kwargs):
         """Connect to a WebSocket."""
@@ -36,27 +117,192 @@ class WebSocket(ClientSession):
         _backoff_count = itertools.count()
         self.logger.debug("Connecting...")
 
+        if len(self.endpoints) > 1:
+            await self.probe()
+
         while True:
+            endpoint = self._endpoint
             try:
-                self.websocket = await self.ws_connect(self._endpoint)
-            except (DisconnectedError, HttpProcessingError, ClientError):
-                backoff = min(base**next(_backoff_count), maximum)
+                self.websocket = await self._connect(endpoint)
+            except self.ERRORS:
+                backoff = random.uniform(
+                    0, min(base**next(_backoff_count), maximum))
                 self.logger.debug("Retrying in %s seconds...", backoff)
                 await asyncio.sleep(backoff)
             else:
+                self.endpoint = endpoint
+                self._monitor()
                 await self.initialize(*args, **kwargs)
                 self.logger.info("Connection established.")
+                await self.resend()
                 return self.websocket
 
+    async def probe(self, timeout=5):
+        """Measure the handshake latency of each endpoint.
+
+        Parameters
+        ----------
+        timeout : :obj:`float`
+            The number of seconds to wait for each handshake.
+        """
+
+        async def probe(endpoint):
+            try:
+                websocket = await asyncio.wait_for(
+                    self._connect(endpoint), timeout)
+            except self.ERRORS + (asyncio.TimeoutError,):
+                self.logger.debug("Probe of %s failed.", endpoint)
+            else:
+                await websocket.close()
+
+        await asyncio.gather(*map(probe, self.endpoints))
+
+    async def _connect(self, endpoint):
+
+        start = time.monotonic()
+        try:
+            websocket = await self.ws_connect(endpoint, autoping=False)
+        except Exception:
+            self.failures[endpoint] += 1
+            raise
+
+        latency = time.monotonic() - start
+        previous = self.latencies[endpoint]
+        if previous is not None:
+            latency = previous + self.SMOOTHING * (latency - previous)
+        self.latencies[endpoint] = latency
+
+        return websocket
+
     async def send(self, packet):
-        """Send a packet to the WebSocket."""
+        """Send a packet to the WebSocket.
+
+        If the connection is closed, the packet is buffered until it is
+        reestablished.
+        """
+
         assert self.websocket is not None, "Must connect to send."
         self.logger.debug(packet)
-        self.websocket.send_str(packet)
+
+        if not self.websocket.closed:
+            try:
+                self.websocket.send_str(packet)
+            except (RuntimeError, OSError):
+                pass
+            else:
+                return
+
+        if len(self.replay) == self.replay.maxlen:
+            self.logger.warning("Replay buffer full. Dropping %s.",
+                                self.replay[0])
+        self.replay.append(packet)
+
+    async def resend(self):
+        """Send the packets buffered while disconnected."""
+
+        packets = list(self.replay)
+        self.replay.clear()
+
+        if packets:
+            self.logger.info("Resending %s packets.", len(packets))
+
+        for packet in packets:
+            await WebSocket.send(self, packet)
 
     async def receive(self):
         """Receive a packet from the WebSocket."""
-        return (await self.websocket.receive()).data
+
+        while True:
+            message = await self.websocket.receive()
+            if message.type == WSMsgType.PING:
+                self.websocket.pong(message.data)
+            elif message.type == WSMsgType.PONG:
+                if self._pong is not None and not self._pong.done():
+                    self._pong.set_result(None)
+            else:
+                return message.data
+
+    def _monitor(self):
+
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+        self._heartbeat_task = asyncio.ensure_future(
+            self._heartbeat(self.websocket))
+
+        WebSocket._lag_users.add(self)
+        if WebSocket._lag_task is None:
+            WebSocket._lag_task = asyncio.ensure_future(self._monitor_lag())
+
+    async def _heartbeat(self, websocket):
+
+        endpoint = self.endpoint
+        probed = time.monotonic()
+
+        while not websocket.closed:
+            await asyncio.sleep(self.HEARTBEAT_INTERVAL)
+
+            self._pong = asyncio.Future()
+            start = time.monotonic()
+            websocket.ping()
+
+            try:
+                await asyncio.wait_for(self._pong, self.HEARTBEAT_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.logger.warning(
+                    "No pong in %s seconds. Closing connection.",
+                    self.HEARTBEAT_TIMEOUT)
+                await websocket.close()
+                return
+
+            self.heartbeat.observe(time.monotonic() - start)
+            self.failures[endpoint] = 0
+
+            if len(self.endpoints) > 1 and \
+                    time.monotonic() - probed >= self.PROBE_INTERVAL:
+                probed = time.monotonic()
+                await self.probe()
+                if self._degraded():
+                    self.logger.warning(
+                        "Endpoint %s degraded. Moving connection.",
+                        self.endpoint)
+                    await websocket.close()
+                    return
+
+    def _degraded(self):
+
+        fastest = self._endpoint
+        if fastest == self.endpoint:
+            return False
+
+        current = self.latencies[self.endpoint]
+        if current is None or self.failures[self.endpoint]:
+            return True
+        return current > self.DEGRADED * (self.latencies[fastest] or 0)
+
+    async def _monitor_lag(self):
+
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.LAG_INTERVAL)
+            lag = max(time.monotonic() - start - self.LAG_INTERVAL, 0)
+            WebSocket.lag.observe(lag)
+            if lag > self.LAG_WARNING:
+                self.logger.warning("Event loop lagged by %.3f seconds.",
+                                    lag)
+
+    def close(self):
+        """Stop monitoring the connection, and close the session."""
+
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+
+        WebSocket._lag_users.discard(self)
+        if not WebSocket._lag_users and WebSocket._lag_task is not None:
+            WebSocket._lag_task.cancel()
+            WebSocket._lag_task = None
+
+        return super().close()
 
     async def read(self, handle):
         """Read packets from the WebSocket."""
@@ -72,6 +318,7 @@ class WebSocket(ClientSession):
                     asyncio.ensure_future(handle(packet))
             else:
                 self.logger.warning("Connection lost. Reconnecting.")
+                self.failures[self.endpoint] += 1
                 await self.connect(*self._init_args, **self._init_kwargs)
 
     async def initialize(self):
@@ -84,4 +331,8 @@ class WebSocket(ClientSession):
 
     @property
     def _endpoint(self):
-        return next(self._endpoint_cycle)
+
+        def score(endpoint):
+            return (self.failures[endpoint], self.latencies[endpoint] or 0)
+
+        return min(self.endpoints, key=score)
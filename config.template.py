@@ -18,14 +18,32 @@ api = CactusAPI(API_TOKEN, API_PASSWORD, url=API_URL)
 # CACHE_TIME: How long in seconds before resending message
 #   Leave at 0 for no repeat follow messages
 #   Only matters if CACHE_FOLLOWS is enabled
+# CACHE_SIZE: Maximum number of users remembered for each event
+#   (Default: 10000)
+# CACHE_FILE: File to keep the cache in across restarts (Default: None)
+#   Leave at None to forget the cache on restart
+# ANNOUNCE_WINDOW: How long in seconds to collect follows and hosts for,
+#   during a raid, before thanking them all in one message (Default: 5)
+#   Leave at 0 to thank every user separately
+# MAX_ANNOUNCE_RATE: Announcements per minute, above which only some joins
+#   and leaves are announced (Default: 20)
+# MAX_BACKLOG: Unsent chat messages, at or above which joins and leaves are
+#   not announced (Default: 5)
 CACHE_DATA = {
     "cache_follow": True,
     "cache_host": True,
     "cache_join": True,
     "cache_leave": True,
-    "cache_time": 1200
+    "cache_time": 1200,
+    "cache_size": 10000,
+    "cache_file": None,
+    "announce_window": 5,
+    "max_announce_rate": 20,
+    "max_backlog": 5
 }
 
+# SpamHandler(api, executor="process") scores messages in batches in another
+#   process, or "thread" for a thread, keeping the event loop responsive
 
 handlers = Handlers(
     LoggingHandler(),
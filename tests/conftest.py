@@ -0,0 +1,16 @@
+import pytest
+
+
+class Clock:
+    """Clock which only moves when its time is set."""
+
+    def __init__(self):
+        self.time = 0
+
+    def __call__(self):
+        return self.time
+
+
+@pytest.fixture
+def clock():
+    return Clock()
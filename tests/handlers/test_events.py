@@ -1,7 +1,9 @@
+import asyncio
+
 import pytest
 
 from cactusbot.handlers import EventHandler
-from cactusbot.packets import EventPacket
+from cactusbot.packets import EventPacket, Packet
 
 
 class MockAPI:
@@ -39,13 +41,21 @@ class MockAPI:
 
         return Response()
 
-event_handler = EventHandler({
+
+CACHE_DATA = {
     "cache_follow": True,
     "cache_host": True,
     "cache_join": True,
     "cache_leave": True,
     "cache_time": 1200
-}, MockAPI())
+}
+
+
+def create_handler(**options):
+    return EventHandler(dict(CACHE_DATA, **options), MockAPI())
+
+
+event_handler = create_handler()
 
 
 @pytest.mark.asyncio
@@ -96,3 +106,103 @@ async def test_on_leave():
     assert (await event_handler.on_leave(EventPacket(
         "leave", "TestUser"
     ))).text == "Thanks for watching, TestUser!"
+
+
+@pytest.mark.asyncio
+async def test_cache():
+
+    handler = create_handler(cache_size=100, max_announce_rate=10 ** 9)
+    await handler.load_messages()
+
+    assert await handler.on_join(EventPacket("join", "TestUser"))
+    assert await handler.on_join(EventPacket("join", "TestUser")) is None
+
+    for index in range(20000):
+        await handler.on_join(EventPacket("join", str(index)))
+        assert len(handler.cached_events["join"]) <= 100
+
+    assert await handler.on_join(EventPacket("join", "TestUser"))
+
+
+@pytest.mark.asyncio
+async def test_coalesce():
+
+    handler = create_handler(announce_window=0.05)
+    await handler.load_messages()
+
+    assert (await handler.on_follow(EventPacket(
+        "follow", "First"
+    ))).text == "Thanks for following, First!"
+
+    responses = await asyncio.gather(*[
+        asyncio.ensure_future(handler.on_follow(EventPacket("follow", user)))
+        for user in ("A", "B", "C", "D", "E")
+    ])
+
+    assert responses[0].text == "Thanks for following, A, B, C and 2 others!"
+    assert responses[1:] == [None] * 4
+    assert handler.stats["merged"] == 4
+
+    assert (await handler.on_host(EventPacket(
+        "host", "Host"
+    ))).text == "Thanks for hosting, Host!"
+
+    await asyncio.sleep(0.05)
+    assert (await handler.on_follow(EventPacket(
+        "follow", "Last"
+    ))).text == "Thanks for following, Last!"
+
+
+@pytest.mark.asyncio
+async def test_cache_file(tmpdir):
+
+    cache_file = str(tmpdir.join("cache.log"))
+
+    handler = create_handler(cache_file=cache_file)
+    await handler.load_messages()
+    assert await handler.on_join(EventPacket("join", "TestUser"))
+    handler.close()
+    assert handler.journal._file is None
+
+    handler = create_handler(cache_file=cache_file)
+    await handler.load_messages()
+    assert await handler.on_join(EventPacket("join", "TestUser")) is None
+    assert await handler.on_leave(EventPacket("leave", "TestUser"))
+
+
+@pytest.mark.asyncio
+async def test_shed():
+
+    handler = create_handler(max_announce_rate=10, max_backlog=3)
+    await handler.load_messages()
+
+    responses = [await handler.on_join(EventPacket("join", str(index)))
+                 for index in range(40)]
+
+    assert all(responses[:10])
+    assert sum(response is not None for response in responses[10:]) == 10
+    assert handler.stats["dropped"] == 20
+
+    assert await handler.on_subscribe(EventPacket("subscribe", "TestUser"))
+
+
+@pytest.mark.asyncio
+async def test_backlog():
+
+    handler = create_handler(announce_window=0.01, max_backlog=3)
+    await handler.load_messages()
+
+    await handler.on_backlog(Packet("backlog", depth=3))
+    assert await handler.on_leave(EventPacket("leave", "A")) is None
+    assert await handler.on_leave(EventPacket("leave", "B")) is None
+    assert handler.stats["dropped"] == 2
+
+    responses = await asyncio.gather(*[
+        asyncio.ensure_future(handler.on_follow(EventPacket("follow", user)))
+        for user in ("A", "B")
+    ])
+    assert responses[0].text == "Thanks for following, A and B!"
+    assert handler.stats["merged"] == 1
+
+    await handler.on_backlog(Packet("backlog", depth=0))
+    assert await handler.on_leave(EventPacket("leave", "A")) is not None
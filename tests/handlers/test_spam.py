@@ -1,22 +1,32 @@
+import asyncio
+
 import pytest
 
 from cactusbot.handlers import SpamHandler
-from cactusbot.packets import MessagePacket
+from cactusbot.handlers.spam import SpamScore, caps_score
+from cactusbot.packets import MessagePacket, Packet
+
+class MockUsers:
+
+    async def get_id(self, _):
+        return 0
 
-async def get_user_id(_):
-    return 0
+    def prefetch(self, *_):
+        pass
 
 
 class MockAPI:
 
-    async def get_trust(self, _):
+    trusted = set()
+
+    async def get_trust(self, _=None):
 
         class Response:
             status = 404
 
         return Response()
 
-spam_handler = SpamHandler(MockAPI())
+spam_handler = SpamHandler(MockAPI(), MockUsers())
 
 
 @pytest.mark.asyncio
@@ -42,6 +52,93 @@ async def test_on_message():
     ) is None
 
 
+@pytest.mark.asyncio
+async def test_on_trust():
+
+    packet = MessagePacket("THIS CONTAINS EXCESSIVE CAPITAL LETTERS.")
+
+    await spam_handler.on_trust(Packet("trust", user_id=0, trusted=True))
+    assert await spam_handler.on_message(packet) is None
+
+    await spam_handler.on_trust(Packet("trust", user_id=0, trusted=False))
+    assert (await spam_handler.on_message(packet))[0].text == \
+        "Please do not spam capital letters."
+
+
+class FlakyAPI:
+
+    def __init__(self):
+        self.trusted = set()
+        self.responses = [ValueError, 500, 200]
+
+    async def get_trust(self, user_id=None):
+
+        class Response:
+            status = 404
+
+        if user_id is not None:
+            Response.status = 200 if user_id == 0 else 404
+            return Response()
+
+        response = self.responses.pop(0)
+        if response is ValueError:
+            raise ValueError
+        Response.status = response
+        if response == 200:
+            self.trusted = {"1"}
+        return Response()
+
+
+@pytest.mark.asyncio
+async def test_load_trust():
+
+    handler = SpamHandler(FlakyAPI(), MockUsers())
+    handler.TRUST_RETRY = 0.01
+    packet = MessagePacket("THIS CONTAINS EXCESSIVE CAPITAL LETTERS.")
+
+    await handler.on_start(None)
+    await asyncio.sleep(0)
+    assert not handler.trust_loaded
+    assert await handler.on_message(packet) is None
+
+    await asyncio.sleep(0.05)
+    assert handler.trust_loaded
+    assert handler.api.responses == []
+    assert (await handler.on_message(packet))[0].text == \
+        "Please do not spam capital letters."
+
+    handler._trust_task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_lookups_avoided():
+
+    handler = SpamHandler(MockAPI(), MockUsers())
+
+    assert await handler.on_message(MessagePacket("Clean message.")) is None
+    assert await handler.on_message(MessagePacket("ALL CAPITALS, NOT CLEAN."))
+
+    assert handler.stats["lookups_avoided"] == 1
+    assert handler.stats["lookups"] == 1
+    assert handler.stats["actioned"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unresolved():
+
+    class UnresolvedUsers(MockUsers):
+
+        async def get_id(self, _):
+            raise LookupError
+
+    handler = SpamHandler(MockAPI(), UnresolvedUsers())
+
+    assert await handler.on_message(
+        MessagePacket("ALL CAPITALS, NOT CLEAN.")) is None
+    assert handler.stats["unresolved"] == 1
+    assert handler.stats["actioned"] == 0
+
+
 def test_check_caps():
 
     assert not spam_handler.check_caps("")
@@ -58,6 +155,121 @@ def test_check_caps():
         "THAT was SO COOL! OMG WOW FANTASTIC!")
 
 
+@pytest.mark.asyncio
+async def test_banned_phrases():
+
+    handler = SpamHandler(MockAPI(), MockUsers())
+
+    await handler.on_config(Packet("config", key="spam", values={
+        "maxEmoji": 6,
+        "maxCapsScore": 16,
+        "allowUrls": False,
+        "bannedPhrases": ["potato salad"]
+    }))
+
+    assert (await handler.on_message(
+        MessagePacket("I love Potato Salad!")
+    ))[0].text == "Please do not use banned phrases."
+    assert await handler.on_message(MessagePacket("I love potatoes!")) is None
+
+
+@pytest.mark.asyncio
+async def test_flood():
+
+    handler = SpamHandler(MockAPI(), MockUsers())
+
+    for _ in range(10):
+        assert await handler.on_message(MessagePacket("Hello!")) is None
+
+    await handler.on_config(Packet("config", key="spam", values={
+        "maxEmoji": 6,
+        "maxCapsScore": 16,
+        "allowUrls": False,
+        "maxMessages": 2,
+        "maxRepeats": 1
+    }))
+
+    assert await handler.on_message(MessagePacket("Hello!")) is None
+    assert (await handler.on_message(
+        MessagePacket("Hello!")))[0].text == "Please do not repeat messages."
+    assert (await handler.on_message(
+        MessagePacket("Goodbye!")))[0].text == "Please slow down."
+
+
+@pytest.mark.asyncio
+async def test_copied_messages():
+
+    handler = SpamHandler(MockAPI(), MockUsers())
+
+    for user in ("Stanley", "2Cubed", "Innectic"):
+        assert await handler.on_message(MessagePacket(
+            "Check out the giveaway at the top of the stream page!",
+            user=user)) is None
+
+    await handler.on_config(Packet("config", key="spam", values={
+        "maxEmoji": 6,
+        "maxCapsScore": 16,
+        "allowUrls": False,
+        "maxCopies": 2
+    }))
+
+    for user in ("Stanley", "2Cubed"):
+        assert await handler.on_message(MessagePacket(
+            "Type 1 in chat if you think this stream is awesome!",
+            user=user)) is None
+
+    assert (await handler.on_message(MessagePacket(
+        "type 1 in chat if you think the stream is awesome!!",
+        user="Innectic")))[0].text == "Please do not spam copied messages."
+
+
+@pytest.mark.asyncio
+async def test_domains():
+
+    handler = SpamHandler(MockAPI(), MockUsers())
+
+    await handler.on_config(Packet("config", key="spam", values={
+        "maxEmoji": 6,
+        "maxCapsScore": 16,
+        "allowUrls": False,
+        "allowedDomains": ["beam.pro"],
+        "deniedDomains": ["example.com"]
+    }))
+
+    assert await handler.on_message(MessagePacket(
+        "Follow me at ", ("url", "beam.pro/2Cubed", "https://beam.pro/2Cubed")
+    )) is None
+    assert await handler.on_message(MessagePacket(
+        "Go to ", ("url", "google.com", "https://google.com")
+    )) is not None
+    assert (await handler.on_message(MessagePacket(
+        "Go to www.example.com for free stuff!"
+    )))[0].text == "Please do not post URLs."
+    assert await handler.on_message(MessagePacket(
+        "Go to google.com for free stuff!"
+    )) is None
+
+
+def test_caps_score():
+
+    for message in ("", "3.14", "Hello, World!", "ÀÉÎõü ABC def", "ΣΊΣΥΦΟΣ"):
+        assert caps_score(message) == sum(
+            char.isupper() - char.islower() for char in message)
+
+
+def test_score_batch():
+
+    assert spam_handler.score_batch([
+        MessagePacket("Hello!"),
+        MessagePacket("HI ", ("emoji", "😃"), ("emoji", "😃")),
+        MessagePacket("See ", ("url", "https://beam.pro", "beam.pro"))
+    ]) == [
+        SpamScore(-3, 0, ()),
+        SpamScore(2, 2, ()),
+        SpamScore(-1, 0, ("https://beam.pro",))
+    ]
+
+
 def test_check_emoji():
 
     assert not spam_handler.check_emoji(MessagePacket(
@@ -113,3 +325,35 @@ def test_check_urls():
         "You should go check out ",
         ("url", "cactusbot.rtfd.org", "https://cactusbot.rtfd.org")
     ))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("executor", ("thread", "process"))
+async def test_executor(executor):
+
+    handler = SpamHandler(
+        MockAPI(), MockUsers(), executor=executor, batch_size=4)
+
+    await handler.on_config(Packet("config", key="spam", values={
+        "maxEmoji": 6,
+        "maxCapsScore": 16,
+        "allowUrls": False,
+        "maxMessages": 6
+    }))
+
+    responses = await asyncio.gather(*[
+        asyncio.ensure_future(handler.on_message(
+            MessagePacket(str(index), user="Stanley")))
+        for index in range(10)
+    ])
+
+    assert [response is None for response in responses] == \
+        [True] * 6 + [False] * 4
+    assert responses[-1][0].text == "Please slow down."
+    assert handler.stats["batches"] == 3
+
+    assert (await handler.on_message(MessagePacket(
+        "THIS CONTAINS EXCESSIVE CAPITAL LETTERS.", user="2Cubed"
+    )))[0].text == "Please do not spam capital letters."
+
+    handler.executor.shutdown()
@@ -0,0 +1,44 @@
+from cactusbot.moderation import DomainFilter
+
+
+def test_check():
+
+    domains = DomainFilter(
+        allowed=["beam.pro", "twitter.com"],
+        denied=["bad.beam.pro", "example.com"])
+
+    assert domains.check("https://beam.pro/2Cubed") is True
+    assert domains.check("HTTPS://WWW.Beam.Pro:443/") is True
+    assert domains.check("twitter.com/CactusDevTeam") is True
+    assert domains.check("https://bad.beam.pro") is False
+    assert domains.check("http://very.bad.beam.pro./path") is False
+    assert domains.check("https://example.com/?url=https://beam.pro") is False
+
+    assert domains.check("https://pro/") is None
+    assert domains.check("https://notbeam.pro") is None
+    assert domains.check("google.com") is None
+    assert domains.check("") is None
+
+
+def test_update():
+
+    domains = DomainFilter(denied=["example.com"])
+    assert domains.check("example.com") is False
+
+    domains.update(allowed=["example.com"])
+    assert domains.check("example.com") is True
+
+    domains.update(allowed=["example.com"], denied=["example.com"])
+    assert domains.check("example.com") is False
+
+
+def test_search():
+
+    domains = DomainFilter(allowed=["beam.pro"], denied=["example.com"])
+
+    assert domains.search("Visit sub.EXAMPLE.com today!") == "sub.example.com"
+    assert domains.search("Visit beam.pro or google.com.") is None
+    assert domains.search("Email me at someone@example.com") is None
+    assert domains.search("Version 1.5 is out. Try it.") is None
+
+    assert DomainFilter(allowed=["beam.pro"]).search("example.com") is None
@@ -0,0 +1,65 @@
+from cactusbot.moderation import FloodDetector
+
+
+def test_flood(clock):
+
+    flood = FloodDetector(max_messages=3, interval=5, clock=clock)
+
+    assert [flood.check("Stanley", str(n)) for n in range(3)] == [None] * 3
+    assert flood.check("stanley", "3") == "flood"
+    assert flood.check("2Cubed", "Hello!") is None
+
+    clock.time = 5
+    assert flood.check("Stanley", "4") is None
+
+
+def test_repeat(clock):
+
+    repeat = FloodDetector(max_repeats=2, repeat_interval=30, clock=clock)
+
+    assert repeat.check("Stanley", "Hello!") is None
+    clock.time = 10
+    assert repeat.check("Stanley", "hello!  ") is None
+    clock.time = 20
+    assert repeat.check("Stanley", "HELLO!") == "repeat"
+
+    clock.time = 45
+    assert repeat.check("Stanley", "Hello!") is None
+
+
+def test_memory(clock):
+
+    flood = FloodDetector(max_messages=2, max_repeats=2, max_users=100,
+                          clock=clock)
+
+    for user in range(1000):
+        for message in range(10):
+            flood.check(str(user), str(message))
+
+    assert len(flood.users) == 100
+    assert all(len(flood.users[user]) <= flood.history
+               for user in flood.users)
+
+    clock.time = 60
+    flood.check("Stanley", "Hello!")
+    assert list(flood.users) == ["stanley"]
+
+
+def test_configure():
+
+    flood = FloodDetector(max_messages=1)
+
+    assert flood.check("Stanley", "a") is None
+    assert flood.check("Stanley", "b") == "flood"
+
+    flood.configure(10, 5, 3, 30)
+    assert flood.check("Stanley", "c") is None
+
+
+def test_disabled():
+
+    flood = FloodDetector(max_messages=0, max_repeats=0)
+
+    assert [flood.check("Stanley", "Hello!") for _ in range(10)] == \
+        [None] * 10
+    assert not list(flood.users)
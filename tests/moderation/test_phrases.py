@@ -0,0 +1,61 @@
+from cactusbot.moderation import PhraseFilter
+
+
+def test_search():
+
+    phrases = PhraseFilter("he", "she", "his", "hers", whole_words=False)
+
+    assert phrases.search("ushers") == "she"
+    assert phrases.search("ahishers") == "his"
+    assert phrases.search("HERS") == "he"
+    assert phrases.search("xyz") is None
+    assert phrases.search("") is None
+
+    assert PhraseFilter().search("anything") is None
+
+
+def test_overlapping():
+
+    phrases = PhraseFilter("abcd", "bc", whole_words=False)
+    assert phrases.search("xabcx") == "bc"
+
+    phrases = PhraseFilter("free money now", "money")
+    assert phrases.search("Get FREE MONEY NOW!") == "money"
+
+
+def test_whole_words():
+
+    phrases = PhraseFilter("ass", "he", "hers", "<3")
+
+    assert phrases.search("What a classic!") is None
+    assert phrases.search("You ASS.") == "ass"
+    assert phrases.search("ushers") is None
+    assert phrases.search("hers?") == "hers"
+    assert phrases.search("i<3 you") == "<3"
+    assert phrases.search("naïve_he") is None
+
+
+def test_update():
+
+    phrases = PhraseFilter("spam")
+    assert phrases.search("eggs and spam") == "spam"
+
+    phrases.add("Eggs")
+    assert "eggs" in phrases
+    assert phrases.search("eggs and spam") == "eggs"
+
+    phrases.remove("eggs")
+    assert phrases.search("eggs and spam") == "spam"
+
+    phrases.update(["ham", "eggs"])
+    assert len(phrases) == 2
+    assert phrases.search("spam") is None
+    assert phrases.search("green eggs and ham") == "eggs"
+
+
+def test_many():
+
+    phrases = PhraseFilter(*("<phrase {}>".format(n) for n in range(5000)))
+
+    assert phrases.search("a <PHRASE 4999> b") == "<phrase 4999>"
+    assert phrases.search("a <phrase 5000> b") is None
@@ -0,0 +1,62 @@
+import random
+
+from cactusbot.moderation import SimilarityDetector
+
+PASTA = ("Hello, I am a bot and I am here to spam your chat. "
+         "Follow my channel for free skins and giveaways!")
+
+WORDS = ("the stream game play chat what when nice good wow great love "
+         "music song level boss fight win lose team map kill again how "
+         "why today later hype clip run speed time best worst fun").split()
+
+
+def vary(text, generator):
+    """Change a few characters of text."""
+
+    chars = list(text)
+    for _ in range(3):
+        chars[generator.randrange(len(chars))] = generator.choice("xyz!")
+    return ''.join(chars)
+
+
+def test_similarity(clock):
+
+    similar = SimilarityDetector(max_copies=2, interval=60, clock=clock)
+    generator = random.Random(0)
+
+    assert not similar.check(vary(PASTA, generator))
+    assert not similar.check(vary(PASTA, generator))
+    assert similar.check(vary(PASTA, generator))
+
+    assert not similar.check("Did anyone else see that amazing play?")
+    assert not similar.check("short")
+
+    clock.time = 60
+    assert not similar.check(vary(PASTA, generator))
+
+
+def test_raid(clock):
+
+    similar = SimilarityDetector(max_messages=100, clock=clock)
+    generator = random.Random(0)
+
+    flagged = 0
+    for index in range(1000):
+        clock.time = index / 10
+        if index % 2:
+            flagged += similar.check(vary(PASTA, generator))
+        else:
+            assert not similar.check(' '.join(
+                generator.sample(WORDS, 8)))
+
+    assert flagged >= 490
+    assert len(similar) <= 100
+    assert len(similar._signatures) <= 100
+
+
+def test_disabled():
+
+    similar = SimilarityDetector(max_copies=0)
+
+    for _ in range(10):
+        assert not similar.check(PASTA)
@@ -16,6 +16,35 @@ def test_copy():
     assert new_copy.user == "TestUser"
 
 
+def test_copy_on_write():
+
+    initial = MessagePacket("Hello, %USER%!", ("emoji", "😃"))
+
+    copy = initial.copy()
+    assert copy.message is initial.message
+
+    copy.replace(**{"%USER%": "Stanley"})
+    assert copy.text == "Hello, Stanley!😃"
+    assert initial.text == "Hello, %USER%!😃"
+
+    initial.sub("Hello", "Goodbye")
+    assert initial.text == "Goodbye, %USER%!😃"
+    assert copy.text == "Hello, Stanley!😃"
+
+    unchanged = initial.copy()
+    unchanged.replace(missing="value")
+    assert unchanged.message is initial.message
+
+
+def test_slice():
+
+    packet = MessagePacket("!command ", ("emoji", "😃"), " argument")
+
+    assert packet[1:].text == "command 😃 argument"
+    assert packet[9:].text == "😃 argument"
+    assert packet[1:].user == packet.user
+
+
 def test_replace():
 
     assert MessagePacket("a b c").replace(a='x', b='y').text == "x y c"
@@ -24,6 +53,16 @@ def test_replace():
 
     assert MessagePacket("a b c").replace(b='').text == "a  c"
 
+    assert MessagePacket("a b c").replace(a='b', b='a').text == "b a c"
+
+    assert MessagePacket("%USER% %USERNAME%").replace(**{
+        "%USER%": "x", "%USERNAME%": "y"
+    }).text == "x y"
+
+    assert MessagePacket("a", ("url", "a.com", "https://a.com")).replace(
+        a='b').json["message"][1] == {
+            "type": "url", "data": "a.com", "text": "https://b.com"}
+
 
 def test_sub():
     """Test regex substitution."""
@@ -53,6 +92,26 @@ def test_split():
     assert _split(" 0 1 2 3 ") == ['0', '1', '2', '3']
 
 
+def test_tokens():
+    """Test cached message tokens."""
+
+    packet = MessagePacket("!Hello ", ("emoji", "😃"), " World", user="Stanley")
+
+    assert [token.text for token in packet.tokens] == ["!Hello", "😃", "World"]
+    assert [token.lower for token in packet.tokens] == ["!hello", "😃", "world"]
+    assert packet.tokens[1].packet.json["message"] == [
+        {"type": "emoji", "data": "😃", "text": "😃"}]
+    assert packet.tokens[0].packet.user == "Stanley"
+
+    assert packet.tokens is packet.tokens
+    assert packet.plain == "!Hello  World"
+
+    packet.replace(World="Universe")
+    assert [token.text for token in packet.tokens] == [
+        "!Hello", "😃", "Universe"]
+    assert packet.plain == "!Hello  Universe"
+
+
 def test_join():
     """Test joining message packets."""
 
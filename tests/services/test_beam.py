@@ -1,4 +1,12 @@
+import asyncio
+
+import pytest
+
+from cactusbot.api import CactusAPI
+from cactusbot.handler import Handlers
+from cactusbot.handlers import CommandHandler, LoggingHandler, SpamHandler
 from cactusbot.packets import MessagePacket
+from cactusbot.services.beam.handler import BeamHandler
 from cactusbot.services.beam.parser import BeamParser
 
 
@@ -63,6 +71,139 @@ def test_parse_message():
         "target": None
     }
 
+    assert BeamParser.parse_message({
+        'channel': 2151,
+        'id': '9a1e3750-a9c8-11e6-9c8f-6bd6b629c2eb',
+        'message': {
+            'message': [
+                {'data': 'Hey ', 'text': 'Hey ', 'type': 'text'},
+                {'id': 95845, 'text': '@Stanley', 'type': 'tag',
+                 'username': 'Stanley'},
+                {'data': ', check ', 'text': ', check ', 'type': 'text'},
+                {'text': 'cactusbot.rtfd.org', 'type': 'link',
+                 'url': 'https://cactusbot.rtfd.org'},
+                {'data': '', 'text': '', 'type': 'text'},
+                {'data': ' out', 'text': ' out', 'type': 'text'}
+            ],
+            'meta': {'whisper': True}
+        },
+        'target': 'CactusBot',
+        'user_id': 2547,
+        'user_name': '2Cubed',
+        'user_roles': ['Mod', 'User']
+    }).json == {
+        "message": [{
+            "type": "text",
+            "data": "Hey ",
+            "text": "Hey "
+        }, {
+            "type": "tag",
+            "data": "Stanley",
+            "text": "@Stanley"
+        }, {
+            "type": "text",
+            "data": ", check ",
+            "text": ", check "
+        }, {
+            "type": "url",
+            "data": "https://cactusbot.rtfd.org",
+            "text": "cactusbot.rtfd.org"
+        }, {
+            "type": "text",
+            "data": " out",
+            "text": " out"
+        }],
+        "user": "2Cubed",
+        "role": 4,
+        "action": False,
+        "target": "CactusBot"
+    }
+
+
+def test_parse_message_lazy():
+
+    packet = BeamParser.parse_message({
+        'channel': 2151,
+        'id': '7f43cca0-a9c5-11e6-9c8f-6bd6b629c2eb',
+        'message': {
+            'message': [
+                {'data': 'Hello, ', 'text': 'Hello, ', 'type': 'text'},
+                {'data': 'world!', 'text': 'world!', 'type': 'text'}
+            ],
+            'meta': {}
+        },
+        'user_id': 2547,
+        'user_name': '2Cubed',
+        'user_roles': ['Owner']
+    })
+
+    assert packet.user == "2Cubed"
+    assert packet.text == "Hello, world!"
+    assert packet._message is None
+
+    assert packet.role == 5
+    assert len(packet.message) == 1
+    assert packet.text == "Hello, world!"
+
+    assert packet.copy(role=1).role == 1
+    assert packet.copy().type == "MessagePacket"
+
+
+@pytest.mark.asyncio
+async def test_handlers_lazy():
+
+    api = CactusAPI("test_token", "test_password")
+    handlers = Handlers(LoggingHandler(), SpamHandler(api),
+                        CommandHandler("TestChannel", api))
+
+    def message(role, *components):
+        return BeamParser.parse_message({
+            'channel': 2151,
+            'id': '7f43cca0-a9c5-11e6-9c8f-6bd6b629c2eb',
+            'message': {'message': list(components), 'meta': {}},
+            'user_id': 2547,
+            'user_name': '2Cubed',
+            'user_roles': [role]
+        })
+
+    packet = message('Mod', {'text': 'Hello, ', 'type': 'text'},
+                     {'text': ':)', 'type': 'emoticon'})
+    assert await handlers.handle("message", packet) == []
+    assert packet.plain == "Hello, "
+    assert packet._message is None
+
+    packet = message('User', {'text': 'Hello, world!', 'type': 'text'})
+    assert await handlers.handlers[2].on_message(packet) is None
+    assert packet._message is None
+
+    api.close()
+
+
+@pytest.mark.asyncio
+async def test_backlog():
+
+    class BacklogHandler:
+
+        def __init__(self):
+            self.depths = []
+
+        async def on_backlog(self, packet):
+            self.depths.append(packet.kwargs["depth"])
+
+    recorder = BacklogHandler()
+    handler = BeamHandler("channel", "token", Handlers(recorder))
+    handler.BACKLOG_INTERVAL = 0.01
+
+    for depth in range(1, 50):
+        handler._backlog(depth)
+    await asyncio.sleep(0.02)
+    handler._backlog(0)
+    await asyncio.sleep(0.02)
+
+    assert recorder.depths == [49, 0]
+
+    handler.api.close()
+
 
 def test_parse_follow():
 
@@ -296,6 +437,10 @@ def test_synthesize():
         "waves", action=True
     )) == (("/me waves",), {})
 
+    assert BeamParser.synthesize(MessagePacket(
+        ("emoji", "🌵"), ("emoji", "🌵"), "cacti", ("emoji", "🌵")
+    )) == ((":cactus :cactus cacti:cactus",), {})
+
     assert BeamParser.synthesize(MessagePacket(
         "Hello!", target="Stanley"
     )) == (("Stanley", "Hello!",), {"method": "whisper"})
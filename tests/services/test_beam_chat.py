@@ -0,0 +1,273 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from cactusbot.services.beam.chat import BeamChat, split_message
+
+
+class MockWebSocket:
+
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+
+    def send_str(self, packet):
+        self.sent.append(json.loads(packet))
+
+
+async def drain(chat):
+    while chat._writer is not None:
+        await asyncio.sleep(0.001)
+
+
+def create_chat(**kwargs):
+
+    depths = []
+    chat = BeamChat(1, "wss://chat.beam.pro",
+                    on_backlog=depths.append, **kwargs)
+    chat.websocket = MockWebSocket()
+    return chat, depths
+
+
+@pytest.mark.asyncio
+async def test_priority():
+
+    chat, depths = create_chat()
+
+    await chat.send("Thanks for following!", priority=BeamChat.LOW)
+    await chat.send("Hello!")
+    await chat.send("Stanley", 5, method="timeout", priority=BeamChat.HIGH)
+    assert chat.depth == 3
+
+    await drain(chat)
+
+    assert [packet["arguments"] for packet in chat.websocket.sent] == [
+        ["Stanley", 5], ["Hello!"], ["Thanks for following!"]]
+    assert depths == [1, 2, 3, 2, 1, 0]
+    assert chat.stats["sent"] == 3
+    assert chat.latency.count == 3
+
+    chat.close()
+
+
+@pytest.mark.asyncio
+async def test_merge():
+
+    chat, _ = create_chat()
+
+    await chat.send("Hello!")
+    await chat.send("How are you?")
+    await chat.send("Stanley", "Hi!", method="whisper")
+    await chat.send("x" * 355)
+    await chat.send("Goodbye!", priority=BeamChat.LOW)
+
+    await drain(chat)
+
+    assert [packet["arguments"] for packet in chat.websocket.sent] == [
+        ["Hello! How are you?"], ["Stanley", "Hi!"], ["x" * 355],
+        ["Goodbye!"]]
+    assert chat.stats["merged"] == 1
+
+    chat.websocket.sent.clear()
+
+    await chat.send("Hi!")
+    await chat.send("/me waves")
+    await chat.send("/me bows")
+    await chat.send("Bye!")
+
+    await drain(chat)
+
+    assert [packet["arguments"] for packet in chat.websocket.sent] == [
+        ["Hi!"], ["/me waves"], ["/me bows"], ["Bye!"]]
+    assert chat.stats["merged"] == 1
+
+    chat.close()
+
+
+@pytest.mark.asyncio
+async def test_rate():
+
+    chat, _ = create_chat(rate=100, burst=2)
+
+    for index in range(6):
+        await chat.send(str(index), method="whisper")
+    await chat.send("auth", method="auth")
+
+    assert chat.websocket.sent[0]["method"] == "auth"
+
+    start = asyncio.get_event_loop().time()
+    await drain(chat)
+    assert asyncio.get_event_loop().time() - start >= 0.035
+
+    assert len(chat.websocket.sent) == 7
+
+    chat.close()
+
+
+def test_split_message():
+
+    assert list(split_message("", 10)) == []
+    assert list(split_message("Hello!", 10)) == ["Hello!"]
+    assert list(split_message("one two three four", 9)) == [
+        "one two", "three", "four"]
+
+    family = "\U0001F468\u200d\U0001F469\u200d\U0001F467"
+    assert list(split_message("ab" + family, 6)) == ["ab", family]
+    assert list(split_message("e\u0301e\u0301", 3)) == [
+        "e\u0301", "e\u0301"]
+
+
+@pytest.mark.asyncio
+async def test_chunks():
+
+    chat, _ = create_chat()
+
+    commands = ', '.join("!command{}".format(index) for index in range(100))
+    await chat.send(commands, id=7)
+    await drain(chat)
+
+    chunks = [packet["arguments"][0] for packet in chat.websocket.sent]
+    assert ' '.join(chunks) == commands
+    assert all(len(chunk) <= 360 for chunk in chunks)
+    assert all(chunk.startswith("!command") for chunk in chunks)
+    assert all(packet["method"] == "msg" for packet in chat.websocket.sent)
+
+    ids = [packet["id"] for packet in chat.websocket.sent]
+    assert ids[0] == 7
+    assert len(set(ids)) == len(ids)
+    assert set(chat._pending) == set(ids)
+
+    chat.close()
+
+
+def reply(packet_id, error=None, data=None):
+    return json.dumps({
+        "type": "reply", "id": packet_id, "error": error, "data": data})
+
+
+@pytest.mark.asyncio
+async def test_reply():
+
+    chat, _ = create_chat()
+
+    sending = asyncio.ensure_future(chat.send("Hello!", wait=True))
+    await asyncio.sleep(0)
+    await drain(chat)
+
+    packet_id = chat.websocket.sent[0]["id"]
+    assert packet_id in chat._pending
+
+    assert await chat.parse(reply(packet_id, data="Hello!")) is None
+    replies = await sending
+    assert replies[0]["data"] == "Hello!"
+
+    await chat.send("Stanley", 5, method="timeout")
+    await drain(chat)
+    await chat.parse(reply(chat.websocket.sent[1]["id"], error="Denied"))
+
+    assert not chat._pending
+    assert chat.round_trip["msg"].count == 1
+    assert chat.round_trip["timeout"].count == 1
+    assert chat.stats["replies"] == 1
+    assert chat.stats["errors"] == 1
+    metrics = chat.metrics()
+    assert metrics["round_trip"]["msg"]["count"] == 1
+    assert metrics["latencies"] == {"wss://chat.beam.pro": None}
+    assert metrics["failures"] == {}
+
+    assert await chat.parse(reply(1000)) is None
+    assert (await chat.parse(json.dumps({"type": "event"})))["type"] == \
+        "event"
+
+    chat.close()
+
+
+@pytest.mark.asyncio
+async def test_reply_timeout():
+
+    chat, _ = create_chat(reply_timeout=0.01)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await chat.send("Hello!", wait=True)
+
+    await asyncio.sleep(0.01)
+    await chat.send("Hello again!")
+    await drain(chat)
+
+    assert chat.stats["timeouts"] == 1
+    assert len(chat._pending) == 1
+
+    chat.close()
+
+
+@pytest.mark.asyncio
+async def test_resend():
+
+    chat, _ = create_chat()
+
+    await chat.send("Unanswered")
+    await drain(chat)
+
+    chat.websocket.closed = True
+    await chat.send("Unsent")
+    await drain(chat)
+    assert chat.depth == 1
+    assert not chat.replay
+
+    chat.replay.append(json.dumps({"type": "method", "method": "msg",
+                                   "arguments": ["Buffered"], "id": 5}))
+
+    chat.websocket = MockWebSocket()
+    start = time.time()
+    await chat.resend()
+    await drain(chat)
+
+    assert [(packet["id"], packet["arguments"])
+            for packet in chat.websocket.sent] == [
+        (0, ["Unanswered"]), (5, ["Buffered"]), (1, ["Unsent"])]
+    assert not chat.replay
+    assert chat.depth == 0
+    assert chat.stats["resent"] == 2
+    assert all(sent >= start for _, sent, _, _ in chat._pending.values())
+
+    chat.close()
+
+
+@pytest.mark.asyncio
+async def test_resend_stale():
+
+    chat, _ = create_chat(reply_timeout=0.01)
+
+    await chat.send("Stanley", 5, method="timeout")
+    await drain(chat)
+    await asyncio.sleep(0.02)
+
+    chat.websocket = MockWebSocket()
+    await chat.resend()
+
+    assert chat.websocket.sent == []
+    assert not chat._pending
+    assert chat.stats["timeouts"] == 1
+
+    chat.close()
+
+
+@pytest.mark.asyncio
+async def test_max_depth():
+
+    chat, _ = create_chat(max_depth=2, rate=1, burst=0)
+
+    await chat.send("a", method="whisper", priority=BeamChat.LOW)
+    await chat.send("b", method="whisper")
+    await chat.send("c", method="whisper", priority=BeamChat.LOW)
+    await chat.send("Stanley", 5, method="timeout", priority=BeamChat.HIGH)
+
+    assert chat.depth == 2
+    assert chat.stats["dropped"] == 2
+    assert [entry.arguments for entry in sorted(chat._queue)] == [
+        ("Stanley", 5), ("b",)]
+
+    chat._writer.cancel()
+    chat.close()
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from cactusbot.services.beam.users import BeamUsers
+
+STATUSES = {"missing": 404, "limited": 429, "broken": 500}
+
+
+class MockAPI:
+
+    def __init__(self):
+        self.requests = []
+
+    async def get(self, endpoint):
+
+        self.requests.append(endpoint)
+        await asyncio.sleep(0)
+
+        class Response:
+
+            status = STATUSES.get(endpoint.rsplit('/', 1)[-1], 200)
+
+            async def json(self):
+                return {"id": len(endpoint)}
+
+        return Response()
+
+
+@pytest.mark.asyncio
+async def test_get_id():
+
+    api = MockAPI()
+    users = BeamUsers(api)
+
+    assert await users.get_id("Stanley") == len("/channels/stanley")
+    assert await users.get_id("@stanley") == len("/channels/stanley")
+    assert api.requests == ["/channels/stanley"]
+
+    assert await users.get_id("missing") is None
+    assert await users.get_id("Missing") is None
+    assert api.requests == ["/channels/stanley", "/channels/missing"]
+
+
+@pytest.mark.asyncio
+async def test_get_id_concurrent():
+
+    api = MockAPI()
+    users = BeamUsers(api)
+
+    results = await asyncio.gather(
+        *(users.get_id("Stanley") for _ in range(5)))
+
+    assert len(set(results)) == 1
+    assert api.requests == ["/channels/stanley"]
+
+
+@pytest.mark.asyncio
+async def test_prefetch():
+
+    api = MockAPI()
+    users = BeamUsers(api, batch_delay=0, batch_size=2)
+
+    users.prefetch("a", "b", "c", "@A")
+    users.prefetch("d")
+    await users._batch
+
+    assert sorted(api.requests) == [
+        "/channels/a", "/channels/b", "/channels/c", "/channels/d"]
+
+    assert await users.get_id("c") == len("/channels/c")
+    assert len(api.requests) == 4
+
+
+@pytest.mark.asyncio
+async def test_get_id_errors():
+
+    api = MockAPI()
+    users = BeamUsers(api)
+
+    with pytest.raises(LookupError):
+        await users.get_id("broken")
+    with pytest.raises(LookupError):
+        await users.get_id("broken")
+    assert len(api.requests) == 2
+    assert users.stats["errors"] == 2
+
+
+@pytest.mark.asyncio
+async def test_prefetch_limits():
+
+    api = MockAPI()
+    users = BeamUsers(api, batch_delay=0, batch_size=2, max_prefetch=3,
+                      prefetch_rate=100)
+
+    users.prefetch("a", "b", "c", "d", "e")
+    assert users.stats["dropped"] == 2
+
+    start = asyncio.get_event_loop().time()
+    await users._batch
+    assert asyncio.get_event_loop().time() - start >= 0.01
+    assert len(api.requests) == 3
+
+    users.batch_delay = 1
+    users.prefetch("limited", "f", "g", "h")
+    users._prefetch.discard("limited")
+    with pytest.raises(LookupError):
+        await users.get_id("limited")
+    assert not users._prefetch
+    assert users.stats["dropped"] == 5
+
+    users._batch.cancel()
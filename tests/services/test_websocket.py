@@ -0,0 +1,193 @@
+import asyncio
+
+import pytest
+from aiohttp import WSMessage, WSMsgType
+from aiohttp.errors import ClientError
+
+from cactusbot.services import WebSocket
+
+
+class MockConnection:
+
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+        self.answer = True
+        self.messages = asyncio.Queue()
+
+    def send_str(self, packet):
+        self.sent.append(packet)
+
+    def ping(self):
+        if self.answer:
+            self.messages.put_nowait(WSMessage(WSMsgType.PONG, b'', None))
+
+    async def receive(self):
+        return await self.messages.get()
+
+    async def close(self):
+        self.closed = True
+        self.messages.put_nowait(WSMessage(WSMsgType.CLOSED, None, None))
+
+
+class MockWebSocket(WebSocket):
+
+    def __init__(self, delays):
+        super().__init__(*delays)
+        self.delays = delays
+        self.attempts = []
+
+    async def ws_connect(self, endpoint, **kwargs):
+        self.attempts.append(endpoint)
+        delay = self.delays[endpoint]
+        if delay is None:
+            raise ClientError
+        await asyncio.sleep(delay)
+        return MockConnection()
+
+
+@pytest.mark.asyncio
+async def test_endpoints():
+
+    websocket = MockWebSocket({"slow": 0.03, "fast": 0.01, "down": None})
+
+    await websocket.connect(base=0)
+    assert websocket.endpoint == "fast"
+    assert websocket.latencies["slow"] > websocket.latencies["fast"]
+    assert websocket.latencies["down"] is None
+    assert websocket.failures["down"] == 1
+
+    websocket.attempts.clear()
+    websocket.delays["fast"] = None
+
+    await websocket.connect(base=0)
+    assert sorted(websocket.attempts[:3]) == ["down", "fast", "slow"]
+    assert websocket.attempts[3:] == ["slow"]
+    assert websocket.endpoint == "slow"
+    assert websocket.failures["fast"] == 1
+
+    websocket.close()
+
+
+@pytest.mark.asyncio
+async def test_failover():
+
+    websocket = MockWebSocket({"a": 0.001, "b": 0.01})
+    await websocket.connect()
+    assert websocket.endpoint == "a"
+
+    reading = asyncio.ensure_future(websocket.read(lambda packet: None))
+    await websocket.websocket.close()
+
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+        if websocket.endpoint == "b":
+            break
+    assert websocket.endpoint == "b"
+    assert websocket.failures["a"] == 1
+
+    reading.cancel()
+    websocket.close()
+
+
+@pytest.mark.asyncio
+async def test_replay():
+
+    websocket = MockWebSocket({"endpoint": 0})
+    await websocket.connect()
+
+    websocket.websocket.closed = True
+    for index in range(WebSocket.REPLAY_SIZE + 1):
+        await websocket.send(str(index))
+    assert len(websocket.replay) == WebSocket.REPLAY_SIZE
+
+    await websocket.connect()
+    assert websocket.websocket.sent == [
+        str(index) for index in range(1, WebSocket.REPLAY_SIZE + 1)]
+    assert not websocket.replay
+
+    websocket.close()
+
+
+class MonitoredWebSocket(MockWebSocket):
+
+    HEARTBEAT_INTERVAL = 0.01
+    HEARTBEAT_TIMEOUT = 0.02
+    LAG_INTERVAL = 0.01
+
+
+@pytest.mark.asyncio
+async def test_heartbeat():
+
+    websocket = MonitoredWebSocket({"endpoint": 0})
+    await websocket.connect()
+
+    connection = websocket.websocket
+    receiving = asyncio.ensure_future(websocket.receive())
+
+    websocket.failures["endpoint"] = 1
+
+    await asyncio.sleep(0.05)
+    assert websocket.failures["endpoint"] == 0
+    assert websocket.heartbeat.count >= 2
+    assert websocket.lag.count >= 2
+    assert not receiving.done()
+
+    connection.answer = False
+    assert await asyncio.wait_for(receiving, 0.1) is None
+    assert connection.closed
+
+    websocket.close()
+    assert WebSocket._lag_task is None
+
+
+@pytest.mark.asyncio
+async def test_shared_lag():
+
+    websockets = [MonitoredWebSocket({"endpoint": 0}) for _ in range(3)]
+    for websocket in websockets:
+        await websocket.connect()
+
+    task = WebSocket._lag_task
+    assert task is not None
+    count = WebSocket.lag.count
+
+    await asyncio.sleep(0.055)
+    assert WebSocket.lag.count - count <= 6
+    assert all(websocket.lag is WebSocket.lag for websocket in websockets)
+
+    websockets[0].close()
+    websockets[1].close()
+    assert WebSocket._lag_task is task
+
+    count = WebSocket.lag.count
+    await asyncio.sleep(0.025)
+    assert WebSocket.lag.count > count
+
+    websockets[2].close()
+    assert WebSocket._lag_task is None
+
+
+@pytest.mark.asyncio
+async def test_degraded():
+
+    class ProbedWebSocket(MonitoredWebSocket):
+
+        SMOOTHING = 1
+        PROBE_INTERVAL = 0.01
+
+    websocket = ProbedWebSocket({"a": 0.001, "b": 0.01})
+    await websocket.connect()
+    assert websocket.endpoint == "a"
+
+    connection = websocket.websocket
+    receiving = asyncio.ensure_future(websocket.receive())
+
+    websocket.delays.update(a=0.03, b=0.001)
+    assert await asyncio.wait_for(receiving, 0.5) is None
+    assert connection.closed
+
+    await websocket.connect()
+    assert websocket.endpoint == "b"
+
+    websocket.close()
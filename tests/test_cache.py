@@ -0,0 +1,88 @@
+from cactusbot.cache import CacheJournal, ExpiringCache
+
+
+def test_maximum():
+
+    cache = ExpiringCache(maximum=3)
+
+    for key in range(10):
+        cache[key] = key * 2
+    assert list(cache) == [7, 8, 9]
+
+    assert cache[7] == 14
+    cache[10] = 20
+    assert list(cache) == [9, 7, 10]
+
+
+def test_ttl(clock):
+
+    cache = ExpiringCache(ttl=10, clock=clock)
+
+    cache["a"] = 1
+    cache.set("b", 2, ttl=20)
+
+    clock.time = 5
+    assert "a" in cache
+    assert cache.get("b") == 2
+
+    clock.time = 10
+    assert "a" not in cache
+    assert cache.get("a", 0) == 0
+    assert cache["b"] == 2
+
+    clock.time = 30
+    cache["c"] = 3
+    assert list(cache) == ["c"]
+
+
+def test_pop():
+
+    cache = ExpiringCache()
+
+    cache["a"] = 1
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    assert len(cache) == 0
+
+
+def test_journal(tmpdir):
+
+    path = str(tmpdir.join("journal.log"))
+
+    caches = {"a": ExpiringCache(ttl=100), "b": ExpiringCache(ttl=100)}
+    journal = CacheJournal(path, caches)
+    journal.load()
+
+    for name, key in (("a", "1"), ("b", "2"), ("a", "3"), ("a", "1")):
+        caches[name][key] = True
+        journal.record(name, key)
+    journal.close()
+
+    with open(path, 'a') as file:
+        file.write("invalid\n")
+
+    reloaded = {"a": ExpiringCache(ttl=100), "b": ExpiringCache(ttl=100)}
+    CacheJournal(path, reloaded).load()
+
+    assert list(reloaded["a"]) == ["3", "1"]
+    assert list(reloaded["b"]) == ["2"]
+
+
+def test_journal_compact(tmpdir):
+
+    path = str(tmpdir.join("journal.log"))
+
+    caches = {"a": ExpiringCache(maximum=10, ttl=100)}
+    journal = CacheJournal(path, caches, compact_minimum=20)
+    journal.load()
+
+    for key in range(1000):
+        caches["a"][str(key)] = True
+        journal.record("a", str(key))
+
+    with open(path) as file:
+        assert len(file.readlines()) <= 20
+
+    reloaded = {"a": ExpiringCache(ttl=100)}
+    CacheJournal(path, reloaded).load()
+    assert list(reloaded["a"]) == [str(key) for key in range(990, 1000)]